@@ -1,8 +1,11 @@
 import os
-from pydantic_settings import BaseSettings
-from typing import List
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List, Literal
 
 class Settings(BaseSettings):
+    # Read .env here too: load_dotenv() in main runs after this module is imported
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
     PROJECT_NAME: str = "AI Meeting Minutes"
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
@@ -10,4 +13,112 @@ class Settings(BaseSettings):
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     CORS_ORIGINS: List[str] = ["http://localhost:8501", "http://localhost:3000"]
 
+    # ---------- Process role ----------
+    # all: everything in one process. api: uploads, jobs, meetings and search; jobs are
+    # left for a transcription process. transcription: workers only. llm: /process only.
+    APP_ROLE: Literal["all", "api", "transcription", "llm"] = "all"
+
+    # ---------- Logging ----------
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json | text
+    # Records waiting for the background log writer; more are dropped, never waited on
+    LOG_QUEUE_SIZE: int = 10000
+    # JSON lines file for trace spans; empty disables tracing
+    TRACE_FILE: str = ""
+
+    # ---------- Uploads ----------
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    MAX_UPLOAD_BYTES: int = 1024 * 1024 * 1024
+
+    # ---------- Whisper engine ----------
+    WHISPER_MODEL_SIZE: str = "small"
+    WHISPER_DEVICE: str = "cpu"
+    WHISPER_COMPUTE_TYPE: str = "int8"  # int8 | int8_float16 | float16 | float32
+    WHISPER_CPU_THREADS: int = 0  # 0 lets CTranslate2 decide
+    WHISPER_NUM_WORKERS: int = 1  # parallel transcriptions the model can serve
+    WHISPER_WARMUP: bool = True
+    WHISPER_DEFAULT_PROFILE: str = "accurate"
+    # Long recordings are split at silences and transcribed by this many worker
+    # processes, each with its own model; 0 or 1 disables sharding
+    WHISPER_SHARD_WORKERS: int = 0
+    WHISPER_SHARD_MIN_SECONDS: float = 600.0  # only audio at least this long is sharded
+    WHISPER_SHARD_SECONDS: float = 300.0  # target shard length
+
+    # ---------- Audio pre-processing ----------
+    # Decode uploads once to 16 kHz mono and drop long silences before Whisper
+    VAD_ENABLED: bool = True
+    # Frames quieter than this (dBFS) count as silence
+    VAD_THRESHOLD_DB: float = -45.0
+    # Only silences at least this long are removed
+    VAD_MIN_SILENCE_SECONDS: float = 1.0
+    # Audio kept around each stretch of speech so words are not clipped
+    VAD_PADDING_SECONDS: float = 0.3
+
+    # ---------- LLM client ----------
+    LLM_TIMEOUT_SECONDS: float = 120.0
+    # Gemini API endpoint override, e.g. http://localhost:8089 for loadtest/fake_gemini.py
+    LLM_BASE_URL: str = ""
+
+    # ---------- LLM retries, hedging and fallbacks ----------
+    # LLM_TIMEOUT_SECONDS bounds a whole call, all attempts included
+    LLM_MAX_ATTEMPTS: int = 3  # per model; only timeouts, 408/429/5xx and connection errors are retried
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = 60.0
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5  # full jitter: sleep uniform(0, base * 2^n), capped below
+    LLM_BACKOFF_MAX_SECONDS: float = 8.0
+    # Comma-separated models tried in order once the requested model has used up its attempts
+    LLM_FALLBACK_MODELS: str = ""
+    # Send a duplicate request when the first is slower than the model's recent p95
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_DELAY_SECONDS: float = 0.0  # fixed hedge delay instead of the observed p95
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # successful calls observed before p95 hedging starts
+
+    # ---------- Prompt size ----------
+    PROMPT_COMPACTION: bool = True
+    LLM_PROMPT_TOKEN_BUDGET: int = 24000  # "auto" mode switches to chunks above this
+    LLM_LARGE_PROMPT_TOKENS: int = 12000  # prompts above this use LLM_LARGE_PROMPT_MODEL
+    LLM_LARGE_PROMPT_MODEL: str = ""
+
+    # ---------- Long transcripts (map-reduce) ----------
+    LLM_CHUNK_TOKENS: int = 6000
+    LLM_MAX_PARALLEL_CHUNKS: int = 4
+
+    # ---------- Batch processing ----------
+    LLM_BATCH_CONCURRENCY: int = 4
+    LLM_BATCH_MAX_CONCURRENCY: int = 16
+    LLM_BATCH_MAX_ITEMS: int = 1000
+
+    # ---------- LLM response cache ----------
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MEMORY_ENTRIES: int = 256
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # ---------- Transcript cache ----------
+    TRANSCRIPT_CACHE_ENABLED: bool = True
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # ---------- Stored full analyses ----------
+    ANALYSIS_STORE_MAX_ENTRIES: int = 10000
+    ANALYSIS_STORE_TTL_SECONDS: int = 30 * 24 * 3600
+
+    # ---------- Full-text search ----------
+    # Needs SQLite with FTS5; search is off for other databases
+    SEARCH_ENABLED: bool = True
+
+    # ---------- Admission control ----------
+    # 0 disables a limit. Refused work gets 429 with Retry-After.
+    LLM_MAX_CONCURRENT_REQUESTS: int = 8  # /process requests analyzed at once
+    LLM_MAX_QUEUED_REQUESTS: int = 32  # /process requests waiting for a slot
+    LLM_RPM_LIMIT: int = 0  # provider requests per minute, per model
+    LLM_TPM_LIMIT: int = 0  # provider tokens per minute, per model (prompt + expected output)
+    LLM_EXPECTED_OUTPUT_TOKENS: int = 2000  # output tokens budgeted per call
+    LLM_RATE_MAX_WAIT_SECONDS: float = 30.0  # longest wait for rate budget before refusing
+    TRANSCRIBE_MAX_QUEUED: int = 50  # queued transcription jobs before uploads are refused
+
+    # ---------- Transcription jobs ----------
+    TRANSCRIBE_WORKERS: int = 1
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_STALE_SECONDS: int = 600
+    JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
+
 settings = Settings()
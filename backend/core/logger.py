@@ -1,7 +1,152 @@
+import atexit
 import logging
+import queue
 import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
+
+from backend.core.config import settings
+from backend.core.metrics import Gauge
+from backend.core.tracing import current_span, request_id_var
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+# uvicorn adds color_message, a copy of the message with terminal colors.
+RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {
+    "message", "asctime", "request_id", "trace_id", "span_id", "color_message",
+}
+
+_listener: QueueListener | None = None
+_queue_handler: "NonBlockingQueueHandler | None" = None
+
+LOG_RECORDS_DROPPED = Gauge(
+    "log_records_dropped", "Log records dropped because the logging queue was full",
+    function=lambda: _queue_handler.dropped if _queue_handler else 0,
+)
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the request id and active span of the code that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        current = current_span()
+        record.trace_id = current.trace_id if current else None
+        record.span_id = current.span_id if current else None
+        return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+            entry["span_id"] = record.span_id
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without waiting: when the queue is full
+    the record is dropped and counted, so a slow sink never stalls a request.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread; only resolve what cannot travel
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 
 def setup_logging():
-    fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    handler = logging.StreamHandler(sys.stdout)
-    logging.basicConfig(level=logging.INFO, format=fmt, handlers=[handler])
+    """
+    Routes all logging (uvicorn's included) through a bounded queue to a background
+    thread that writes to stdout, as JSON lines or LOG_FORMAT=text, and writes
+    trace spans to TRACE_FILE when it is set.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    stdout = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "text":
+        stdout.setFormatter(TextFormatter(TEXT_FORMAT))
+    else:
+        stdout.setFormatter(JsonFormatter())
+    handlers = [stdout]
+
+    trace_logger = logging.getLogger("trace")
+    trace_logger.propagate = False
+    if settings.TRACE_FILE:
+        trace_file = logging.FileHandler(settings.TRACE_FILE)
+        trace_file.setFormatter(logging.Formatter("%(message)s"))
+        trace_file.addFilter(lambda record: record.name == "trace")
+        stdout.addFilter(lambda record: record.name != "trace")
+        handlers.append(trace_file)
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    trace_logger.handlers = [queue_handler]
+    trace_logger.setLevel(logging.INFO)
+    # uvicorn installs its own synchronous handlers before importing the app
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    _queue_handler = queue_handler
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Writes out everything still queued and stops the listener thread. The queue
+    handler is detached too, so a later setup_logging() starts from scratch.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        logging.getLogger("trace").removeHandler(_queue_handler)
+        _queue_handler = None
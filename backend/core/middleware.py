@@ -0,0 +1,111 @@
+import re
+import uuid
+from starlette.responses import JSONResponse
+from backend.core.config import settings
+from backend.core.tracing import request_id_var, span
+
+# Room for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+REQUEST_ID_HEADER = b"x-request-id"
+# Client-supplied ids are echoed into logs, so only accept short, plain ones
+REQUEST_ID_RE = re.compile(rb"^[\w.:-]{1,128}$")
+
+
+class BodyTooLarge(Exception):
+    """Raised from `receive` once a request body has gone over the upload limit."""
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects oversized uploads with 413. A Content-Length over the limit is refused
+    before the body is read; otherwise the bytes are counted as they arrive (chunked
+    bodies have no Content-Length), and the request is aborted as soon as the count
+    goes over the limit, before the rest is spooled or written anywhere.
+    """
+
+    def __init__(self, app, path_prefix: str = "/upload"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Upload exceeds the maximum size of {settings.MAX_UPLOAD_BYTES} bytes"},
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD
+        content_length = dict(scope.get("headers") or []).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        too_large = response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    too_large = True
+                    raise BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Whatever the app answers to the aborted body is replaced by the 413
+            if too_large:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not too_large:
+                raise
+        if too_large and not response_started:
+            await self._reject(scope, receive, send)
+
+
+class RequestIdMiddleware:
+    """
+    Gives every HTTP request an id, taken from a well-formed X-Request-ID header or
+    generated, that is set on every log record and span the request produces and
+    returned in the X-Request-ID response header. Each request is also the root
+    span of its trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER)
+        request_id = incoming.decode() if incoming and REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        try:
+            with span("http.request", method=scope["method"], path=scope["path"]) as current:
+                async def send_with_id(message):
+                    if message["type"] == "http.response.start":
+                        current.set_attribute("status_code", message["status"])
+                        message["headers"] = [
+                            *message.get("headers", []), (REQUEST_ID_HEADER, request_id.encode())
+                        ]
+                    await send(message)
+
+                await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
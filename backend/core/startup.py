@@ -0,0 +1,69 @@
+"""
+Startup timing for this process: how long each router import, heavy dependency
+import and lifespan step (database, model loading) took. Reported at GET /startup
+and logged once the app is ready, to see what a cold start is spent on.
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from backend.core.config import settings
+
+logger = logging.getLogger("startup")
+
+# Steps listed in the startup log line
+LOGGED_STEPS = 5
+
+_started = time.perf_counter()
+_ready_seconds: float | None = None
+_steps: list[dict] = []
+_lock = threading.Lock()
+
+
+@contextmanager
+def timed(name: str, kind: str = "startup"):
+    """Records how long the enclosed block took; `kind` is "import" or "startup"."""
+    step = {"name": name, "kind": kind, "start_offset_seconds": round(time.perf_counter() - _started, 4)}
+    with _lock:
+        _steps.append(step)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        step["seconds"] = round(time.perf_counter() - started, 4)
+
+
+def lazy_import(name: str):
+    """
+    Imports a heavy dependency where it is first needed instead of at module load,
+    so processes that never use it don't pay for it. The first import is timed.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        with timed(name, "import"):
+            module = importlib.import_module(name)
+    return module
+
+
+def mark_ready():
+    global _ready_seconds
+    _ready_seconds = time.perf_counter() - _started
+    slowest = sorted((s for s in _steps if "seconds" in s), key=lambda s: s["seconds"], reverse=True)
+    logger.info(
+        f"Started as '{settings.APP_ROLE}' in {_ready_seconds:.2f}s; slowest steps: "
+        + ", ".join(f"{s['name']} {s['seconds']:.2f}s" for s in slowest[:LOGGED_STEPS])
+    )
+
+
+def report() -> dict:
+    """Steps in the order they started. Imports made inside a step are also listed on their own."""
+    with _lock:
+        steps = [dict(s) for s in _steps]
+    return {
+        "role": settings.APP_ROLE,
+        "ready_seconds": round(_ready_seconds, 4) if _ready_seconds is not None else None,
+        "steps": steps,
+    }
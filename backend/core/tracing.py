@@ -0,0 +1,111 @@
+"""
+Request correlation and lightweight trace spans.
+
+The request id and the active span live in context variables, so they follow a
+request through awaits, asyncio tasks and run_in_threadpool. Finished spans are
+written as JSON lines to TRACE_FILE by the "trace" logger, through the same
+background queue as all other logs (see backend/core/logger.py). Span records
+use OpenTelemetry's conventions: hex trace and span ids and Unix-nanosecond
+timestamps.
+"""
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import orjson
+
+from backend.core.config import settings
+
+trace_logger = logging.getLogger("trace")
+
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("current_span", default=None)
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def current_span() -> "Span | None":
+    return _current_span.get()
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.error = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+            "requestId": request_id_var.get(),
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is off, so call sites never check."""
+
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def tracing_enabled() -> bool:
+    return bool(settings.TRACE_FILE)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Times the enclosed block as a child of the active span, or as the root of a
+    new trace. Exceptions mark the span as failed and propagate unchanged.
+    """
+    if not tracing_enabled():
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.trace_id if parent else new_trace_id(), parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Async generators can be finalized from another context than the one they started in
+            pass
+        current.end_ns = time.time_ns()
+        trace_logger.info(orjson.dumps(current.to_dict(), default=str).decode())
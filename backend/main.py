@@ -1,19 +1,84 @@
-from fastapi import FastAPI
+import importlib
+import logging
+from contextlib import asynccontextmanager
+# Before the other imports, so startup timing starts as early as possible
+from backend.core import startup
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes.upload import router as upload_router
-from backend.routes.process import router as process_router
+from fastapi.responses import JSONResponse
 #from backend.routes.sentiment import router as sentiment_router
 from backend.core.config import settings
+from backend.core.database import init_db
 from backend.core.logger import setup_logging
+from backend.core.middleware import RequestIdMiddleware, UploadSizeLimitMiddleware
+from backend.services.admission import Overloaded
 from dotenv import load_dotenv
 
 load_dotenv()
 setup_logging()
+logger = logging.getLogger("main")
+
+# Routers each APP_ROLE serves, imported only by the processes that serve them
+ROLE_ROUTERS = {
+    "api": ["upload", "jobs", "meetings", "search"],
+    "transcription": [],
+    "llm": ["process"],
+}
+# Served by every role
+COMMON_ROUTERS = ["metrics", "admission", "startup"]
+
+
+def role_routers(role: str) -> list[str]:
+    if role == "all":
+        return [name for names in ROLE_ROUTERS.values() for name in names] + COMMON_ROUTERS
+    return ROLE_ROUTERS[role] + COMMON_ROUTERS
+
+
+def runs_transcription() -> bool:
+    return settings.APP_ROLE in ("all", "transcription")
+
+
+def runs_llm() -> bool:
+    return settings.APP_ROLE in ("all", "llm")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup.timed("init_db"):
+        init_db()
+    with startup.timed("search_index"):
+        from backend.services.search_index import ensure_index as ensure_search_index
+
+        ensure_search_index()
+    if runs_llm():
+        from backend.services.llm_client import LLMClient
+
+        with startup.timed("llm_client"):
+            app.state.llm_client = LLMClient()
+    if runs_transcription():
+        from backend.services.audio_transcribe import shutdown_shard_pool, warm_up_model
+        from backend.services.job_queue import job_queue
+
+        if settings.WHISPER_WARMUP:
+            try:
+                with startup.timed("whisper_warmup"):
+                    await run_in_threadpool(warm_up_model)
+            except Exception as e:
+                logger.error(f"Whisper warm-up failed, the model will load on first use: {e}")
+        job_queue.start()
+    startup.mark_ready()
+    yield
+    if runs_transcription():
+        job_queue.stop()
+        shutdown_shard_pool()
+
 
 app = FastAPI(
     title="AI Meeting Minutes Generator + Action Item Tracker",
     description="Upload meeting transcripts (txt/pdf), generate summaries, timeline, action items, speaker sentiment.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -23,9 +88,24 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(UploadSizeLimitMiddleware)
+# Added last so it runs first: even rejected uploads get a request id
+app.add_middleware(RequestIdMiddleware)
+
+for name in role_routers(settings.APP_ROLE):
+    with startup.timed(f"backend.routes.{name}", "import"):
+        module = importlib.import_module(f"backend.routes.{name}")
+    app.include_router(module.router)
+
 
-app.include_router(upload_router)
-app.include_router(process_router)
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Work refused by admission control, wherever it was raised, becomes 429 + Retry-After."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.get("/")
 async def root():
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from backend.core.database import Base
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_jobs"
+
+    id = Column(String(36), primary_key=True)
+    file_id = Column(String(36), index=True, nullable=False)
+    filename = Column(String(255), nullable=False)
+    path = Column(String(1024), nullable=False)
+    status = Column(String(16), index=True, nullable=False, default="queued")
+    progress = Column(Float, nullable=False, default=0.0)
+    transcript = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    callback_url = Column(String(2048), nullable=True)
+    profile = Column(String(16), nullable=True)
+    audio_sha256 = Column(String(64), nullable=True)
+    vad = Column(Boolean, nullable=True)
+    cache_hit = Column(Boolean, nullable=True)
+    audio_duration = Column(Float, nullable=True)
+    skipped_seconds = Column(Float, nullable=True)
+    transcribe_seconds = Column(Float, nullable=True)
+    rtf = Column(Float, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), index=True, nullable=False, default=utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(36), primary_key=True)
+    filename = Column(String(255), nullable=False)
+    path = Column(String(1024), nullable=False)
+    total_size = Column(Integer, nullable=False)
+    received_bytes = Column(Integer, nullable=False, default=0)
+    status = Column(String(16), nullable=False, default="open")
+    callback_url = Column(String(2048), nullable=True)
+    profile = Column(String(16), nullable=True)
+    vad = Column(Boolean, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
+
+
+class TranscriptCacheEntry(Base):
+    __tablename__ = "transcript_cache"
+
+    key = Column(String(160), primary_key=True)
+    transcript = Column(Text, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    audio_duration = Column(Float, nullable=True)
+    skipped_seconds = Column(Float, nullable=True)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    last_accessed_at = Column(DateTime(timezone=True), index=True, nullable=False, default=utcnow)
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)
+    response = Column(Text, nullable=False)
+    model = Column(String(128), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    last_accessed_at = Column(DateTime(timezone=True), index=True, nullable=False, default=utcnow)
+
+
+class AnalysisResult(Base):
+    __tablename__ = "analysis_results"
+
+    key = Column(String(160), primary_key=True)
+    result = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), index=True, nullable=False, default=utcnow)
+    last_accessed_at = Column(DateTime(timezone=True), index=True, nullable=True, default=utcnow)
+
+
+class Meeting(Base):
+    """One processed meeting; re-processing the same transcript for the same date updates it."""
+    __tablename__ = "meetings"
+    __table_args__ = (
+        Index("ix_meetings_transcript_date", "transcript_sha256", "meeting_date", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    transcript_sha256 = Column(String(64), nullable=False)
+    meeting_title = Column(String(255), nullable=True)
+    meeting_date = Column(String(10), index=True, nullable=True)
+    result = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
+
+
+class MeetingActionItem(Base):
+    __tablename__ = "action_items"
+    __table_args__ = (
+        # Keyset pagination walks ids within an assignee / deadline range
+        Index("ix_action_items_assignee_id", "assigned_to", "id"),
+        Index("ix_action_items_deadline_id", "deadline", "id"),
+        Index("ix_action_items_meeting_date_id", "meeting_date", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(Integer, ForeignKey("meetings.id", ondelete="CASCADE"), index=True, nullable=False)
+    task = Column(Text, nullable=False)
+    assigned_to = Column(String(255), nullable=True)
+    # ISO dates (YYYY-MM-DD) compare correctly as strings
+    deadline = Column(String(32), nullable=True)
+    meeting_date = Column(String(10), nullable=True)
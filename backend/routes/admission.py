@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from backend.services.admission import llm_lane, llm_rate_limiter
+from backend.services.job_queue import job_queue
+
+router = APIRouter(prefix="/admission", tags=["Admission"])
+
+
+@router.get("")
+async def admission_status():
+    """
+    Queue depth, limits and rejections of the LLM and transcription lanes, and the
+    RPM/TPM budget left per model.
+    """
+    return {
+        "llm": llm_lane.stats(),
+        "transcription": await run_in_threadpool(job_queue.capacity_stats),
+        "llm_rate": llm_rate_limiter.stats(),
+    }
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from backend.services.job_queue import job_queue
+from backend.schemas import JobResponse, ProfileStats
+from typing import List
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+@router.get("/profiles", response_model=List[ProfileStats])
+async def get_profile_stats():
+    """Real-time factor recorded per transcription profile, to tune speed against accuracy."""
+    return await run_in_threadpool(job_queue.profile_stats)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
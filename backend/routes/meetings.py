@@ -0,0 +1,55 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from backend.services import meeting_store
+from backend.schemas import ActionItemPage, MeetingPage, ProcessResponse
+from typing import Optional
+
+router = APIRouter(tags=["Meetings"])
+
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+@router.get("/action-items", response_model=ActionItemPage)
+async def list_action_items(
+    assignee: Optional[str] = None,
+    due_before: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    due_after: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    meeting_date_from: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    meeting_date_to: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    meeting_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Stored action items across all meetings, e.g. `?assignee=Alice&due_before=2025-12-31`.
+    Pass the returned `next_cursor` as `cursor` to get the next page.
+    """
+    try:
+        return await run_in_threadpool(
+            meeting_store.list_action_items,
+            assignee, due_before, due_after, meeting_date_from, meeting_date_to, meeting_id, cursor, limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/meetings", response_model=MeetingPage)
+async def list_meetings(
+    date_from: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    date_to: Optional[str] = Query(None, pattern=DATE_PATTERN),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Stored meetings, newest first."""
+    try:
+        return await run_in_threadpool(meeting_store.list_meetings, date_from, date_to, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/meetings/{meeting_id}", response_model=ProcessResponse)
+async def get_meeting(meeting_id: int):
+    meeting = await run_in_threadpool(meeting_store.get_meeting, meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from backend.core import metrics
+
+router = APIRouter(tags=["Metrics"])
+
+# Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus metrics of this process: per-stage latency histograms, counters and queue gauges."""
+    # Some gauges read the database, so render off the event loop
+    body = await run_in_threadpool(metrics.render)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE)
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from backend.services.llm_client import LLMClient
-from backend.services.prompt_builder import build_prompt
-from backend.utils.validators import ensure_json_serializable
-from backend.schemas import ProcessRequest, ProcessResponse
-import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from backend.services.admission import llm_lane
+from backend.services.llm_client import LLMClient, get_llm_client
+from backend.services.llm_cache import llm_cache
+from backend.services.meeting_processor import ProcessingError, process_batch, process_request, stream_process
+from backend.schemas import BatchProcessRequest, ProcessRequest, ProcessResponse
+from backend.core.config import settings
+from backend.utils.responses import ORJSONResponse
 import logging
-import re
+import orjson
 
 
 router = APIRouter(prefix="/process", tags=["Process"])
@@ -15,8 +17,8 @@ logger = logging.getLogger("process_router")
 class RawRequest(ProcessRequest):
     pass
 
-@router.post("", response_model=ProcessResponse)
-async def process_meeting(req: RawRequest):
+@router.post("", response_model=ProcessResponse, response_class=ORJSONResponse)
+async def process_meeting(req: RawRequest, llm: LLMClient = Depends(get_llm_client)):
     """
     Accepts:
     {
@@ -26,64 +28,66 @@ async def process_meeting(req: RawRequest):
       "include_speakers": true,
       "include_sentiment": true,
       "include_timeline": true,
-      "language": "english"
+      "language": "english",
+      "mode": "auto"
     }
+    `mode` "chunked" splits the transcript into token-budgeted chunks analyzed
+    concurrently and merges the results; "auto" does so for long transcripts.
+    Answers 429 with Retry-After when LLM_MAX_QUEUED_REQUESTS requests are already waiting.
     """
-    if not req.transcript or len(req.transcript.strip()) < 10:
-        raise HTTPException(status_code=400, detail="Transcript is too short or empty.")
+    try:
+        async with llm_lane.admit():
+            result = await process_request(req, llm)
+    except ProcessingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    # Already validated by process_request; skip FastAPI's second validation pass
+    return ORJSONResponse(result.model_dump())
 
-    # Detect timestamps like 00:12 or 1:05:33
-    has_timestamps = bool(
-    re.search(
-        r"\[\s*\d+(\.\d+)?\s*-\s*\d+(\.\d+)?\s*\]|\b\d{1,2}:\d{2}(:\d{2})?\b",
-        req.transcript
-    )
-)
 
-    # Only allow timeline if user asked AND transcript has timestamps
-    include_timeline_effective = req.include_timeline and has_timestamps
+@router.post("/stream")
+async def process_meeting_stream(req: RawRequest, llm: LLMClient = Depends(get_llm_client)):
+    """
+    Same input as POST /process, answered as Server-Sent Events while the model generates:
+    "item" events carry one entry of an array field (summary_short, action_items, timeline, ...),
+    "field" events a complete top-level field, then one "result" event with the validated
+    response, or an "error" event.
+    """
+    # Refuse before the 200 is sent; the slot itself is taken once streaming starts
+    llm_lane.check()
+    try:
+        events = stream_process(req, llm)
+    except ProcessingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    prompt = build_prompt(
-        transcript=req.transcript,
-        meeting_title=req.meeting_title,
-        meeting_date=req.meeting_date,
-        include_speakers=req.include_speakers,
-        include_sentiment=req.include_sentiment,
-        include_timeline=include_timeline_effective,
-        language=req.language
-    )
+    async def sse():
+        async with llm_lane.admit(bounded=False):
+            async for event in events:
+                yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
 
-    llm = LLMClient()
-    output_text = llm.complete(prompt)
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
-    # The model MUST return JSON. We attempt to parse.
-    try:
-        parsed = json.loads(output_text)
-    except Exception as e:
-        logger.error("LLM returned non-JSON. Try to extract JSON portion.")
-        # fallback attempt: try to locate first { ... } chunk
-        match = re.search(r"\{.*\}", output_text, re.DOTALL)
-        if match:
-            try:
-                parsed = json.loads(match.group(0))
-            except Exception as e2:
-                raise HTTPException(status_code=500, detail=f"Failed to parse model JSON: {str(e2)}")
-        else:
-            raise HTTPException(status_code=500, detail="LLM did not return JSON.")
 
-    # Basic validation
-    ensure_json_serializable(parsed)
+@router.post("/batch")
+async def process_meeting_batch(req: BatchProcessRequest, llm: LLMClient = Depends(get_llm_client)):
+    """
+    Processes many transcripts concurrently and streams one NDJSON line per item as
+    soon as it finishes (completion order, not request order):
+    {"index": 3, "status": "ok", "result": {...}}
+    {"index": 1, "status": "error", "status_code": 400, "error": "..."}
+    """
+    if len(req.items) > settings.LLM_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"A batch may contain at most {settings.LLM_BATCH_MAX_ITEMS} items")
+
+    concurrency = min(req.concurrency or settings.LLM_BATCH_CONCURRENCY, settings.LLM_BATCH_MAX_CONCURRENCY)
+
+    async def lines():
+        async for item in process_batch(req.items, llm, concurrency):
+            yield orjson.dumps(item) + b"\n"
 
-    # Enforce empty timeline when we disabled it
-    if not include_timeline_effective:
-        parsed["timeline"] = []
-    
-    # Enforce empty sentiment when we disabled it
-    if not req.include_sentiment:
-        parsed["speaker_sentiment"] = {}
-    
-    parsed["meeting_title"] = req.meeting_title
-    parsed["meeting_date"] = req.meeting_date
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
-    return parsed
 
+@router.get("/cache")
+async def cache_stats():
+    """Hit/miss counters of the LLM response cache."""
+    return llm_cache.stats()
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from backend.services import search_index
+from backend.schemas import SearchResponse
+from typing import Literal, Optional
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    kind: Optional[Literal["segment", "summary", "action_item"]] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Full-text search over transcript segments, meeting summaries and action items,
+    best matches first. Matches are wrapped in <mark> in `snippet`; segment hits
+    carry `start` seconds (and `timestamp`) to jump to in the recording.
+    """
+    results = await run_in_threadpool(search_index.search, q, kind, limit, offset)
+    if results is None:
+        raise HTTPException(status_code=503, detail="Full-text search is not available")
+    return results
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from backend.core import startup
+
+router = APIRouter(tags=["Startup"])
+
+
+@router.get("/startup")
+async def startup_report():
+    """This process's role, time to ready, and how long each import and startup step took."""
+    return startup.report()
@@ -1,33 +1,180 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-from backend.services.audio_transcribe import transcribe_audio
-from backend.core.config import settings
-from backend.schemas import UploadResponse
+from fastapi import APIRouter, File, Form, Query, Request, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from backend.core.metrics import Counter, Histogram
+from backend.core.tracing import span
+from backend.services.admission import Overloaded
+from backend.services.job_queue import job_queue
+from backend.services.upload_storage import (
+    UploadSessionError,
+    UploadTooLarge,
+    append_chunk,
+    complete_session,
+    create_session,
+    get_session,
+    hash_session,
+    save_upload,
+    upload_path,
+)
+from backend.schemas import TranscriptionProfile, UploadResponse, UploadSessionCreate, UploadSessionResponse
+from typing import Literal, Optional
+import json
 import os
+import time
 import uuid
 
 router = APIRouter(prefix="/upload", tags=["Upload Audio"])
 
 AUDIO_EXTS = (".mp3", ".wav", ".m4a", ".flac", ".ogg")
 
-@router.post("", response_model=UploadResponse)
-async def upload_audio(file: UploadFile = File(...)):
-    if not file.filename.lower().endswith(AUDIO_EXTS):
+UPLOAD_BYTES = Counter("upload_bytes_total", "Bytes of audio received by POST /upload")
+UPLOAD_SIZE = Histogram(
+    "upload_size_bytes", "Size of audio files received by POST /upload",
+    buckets=[2 ** n * 1024 * 1024 for n in range(11)],
+)
+UPLOAD_WRITE_SECONDS = Histogram("upload_write_seconds", "Time spent streaming an upload to disk and hashing it")
+
+
+def check_audio_filename(filename: str):
+    if not filename or not filename.lower().endswith(AUDIO_EXTS):
         raise HTTPException(status_code=400, detail="Only audio files are supported (mp3/wav/m4a/flac/ogg)")
 
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
+def upload_response(job: dict) -> dict:
+    return {
+        "file_id": job["file_id"],
+        "filename": job["filename"],
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "cache_hit": job["cache_hit"],
+        "transcript": job["transcript"],
+    }
+
+
+@router.post("", response_model=UploadResponse, status_code=202)
+async def upload_audio(
+    file: UploadFile = File(...),
+    callback_url: Optional[str] = Form(None),
+    profile: Optional[TranscriptionProfile] = Form(None),
+    vad: Optional[bool] = Form(None),
+):
+    """
+    Saves the audio file and queues a transcription job.
+    Poll GET /jobs/{job_id} for progress, or pass `callback_url` to be notified on completion.
+    `profile` picks the speed/accuracy trade-off: fast (greedy), balanced or accurate.
+    `vad` skips silence before transcribing (default VAD_ENABLED); timestamps still
+    refer to the original recording and the job reports `skipped_seconds`.
+    Audio that was already transcribed with the same profile is answered from the
+    transcript cache: the job comes back "done" with `cache_hit` set and the transcript.
+    Answers 429 with Retry-After when TRANSCRIBE_MAX_QUEUED jobs are already waiting.
+    """
+    check_audio_filename(file.filename)
+
     file_id = str(uuid.uuid4())
-    dest = os.path.join(settings.UPLOAD_DIR, f"{file_id}_{file.filename}")
-    with open(dest, "wb") as f:
-        f.write(await file.read())
+    dest = upload_path(file_id, file.filename)
+    started = time.perf_counter()
+    with span("upload.save", file_id=file_id) as current:
+        try:
+            audio_sha256 = await save_upload(file, dest)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        size = os.path.getsize(dest)
+        current.set_attribute("bytes", size)
+    UPLOAD_WRITE_SECONDS.observe(time.perf_counter() - started)
+    UPLOAD_BYTES.inc(size)
+    UPLOAD_SIZE.observe(size)
 
     try:
-        transcript = transcribe_audio(dest)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Transcription failed: {e}")
-
-    return JSONResponse(content={
-        "file_id": file_id,
-        "filename": file.filename,
-        "transcript": transcript
-    })
+        job = await run_in_threadpool(
+            job_queue.enqueue, file_id, file.filename, dest, callback_url, profile, audio_sha256, vad
+        )
+    except Overloaded:
+        os.remove(dest)
+        raise
+    return upload_response(job)
+
+
+@router.get("/{file_id}/stream")
+async def stream_transcript(file_id: str, format: Literal["ndjson", "sse"] = "ndjson"):
+    """
+    Streams the transcript of an uploaded file segment by segment while it is being
+    transcribed. Each event is JSON with a "type" of status, segment, done or error;
+    segment events carry start, end, text, the "[start - end] text" line and progress.
+    """
+    job = await run_in_threadpool(job_queue.latest_job_for_file, file_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="No transcription job for this file")
+
+    if format == "sse":
+        def encode(event):
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        media_type = "text/event-stream"
+    else:
+        def encode(event):
+            return json.dumps(event) + "\n"
+        media_type = "application/x-ndjson"
+
+    # Waits for segments on the event loop, so a viewer holds no threadpool slot
+    events = (encode(event) async for event in job_queue.stream_segments(job["job_id"]))
+    return StreamingResponse(events, media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+
+# ---------------- Chunked / resumable uploads ----------------
+
+@router.post("/sessions", response_model=UploadSessionResponse, status_code=201)
+async def start_upload_session(req: UploadSessionCreate):
+    """
+    Starts a chunked upload. Send the file with PUT /upload/sessions/{upload_id}?offset=N
+    (raw bytes as the body), then POST /upload/sessions/{upload_id}/complete.
+    """
+    check_audio_filename(req.filename)
+    try:
+        return await run_in_threadpool(
+            create_session, req.filename, req.total_size, req.callback_url, req.profile, req.vad
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+
+@router.get("/sessions/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(upload_id: str):
+    session = await run_in_threadpool(get_session, upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
+
+
+@router.put("/sessions/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(upload_id: str, request: Request, offset: int = Query(..., ge=0)):
+    try:
+        return await append_chunk(upload_id, offset, request.stream())
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
+@router.post("/sessions/{upload_id}/complete", response_model=UploadResponse, status_code=202)
+async def complete_upload_session(upload_id: str):
+    """
+    Queues the transcription job for a fully received upload. Answers 429 with
+    Retry-After when the transcription queue is full and the audio has no cached
+    transcript; the session then stays open and can be completed later.
+    """
+    try:
+        hashed = await run_in_threadpool(hash_session, upload_id)
+        await run_in_threadpool(job_queue.check_admission, hashed["audio_sha256"], hashed["profile"], hashed["vad"])
+        upload = await run_in_threadpool(complete_session, upload_id, hashed["audio_sha256"])
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    job = await run_in_threadpool(
+        job_queue.enqueue,
+        upload["file_id"],
+        upload["filename"],
+        upload["path"],
+        upload["callback_url"],
+        upload["profile"],
+        upload["audio_sha256"],
+        upload["vad"],
+        admit=False,
+    )
+    return upload_response(job)
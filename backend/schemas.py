@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from pydantic import BaseModel, Field
+from typing import List, Dict, Literal, Optional, Any
+
+TranscriptionProfile = Literal["fast", "balanced", "accurate"]
 
 class BaseResponse(BaseModel):
     pass
@@ -7,7 +9,53 @@ class BaseResponse(BaseModel):
 class UploadResponse(BaseModel):
     file_id: str
     filename: str
-    transcript: str
+    job_id: str
+    status: str
+    cache_hit: bool = False
+    transcript: Optional[str] = None
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int = Field(..., gt=0)
+    callback_url: Optional[str] = None
+    profile: Optional[TranscriptionProfile] = None
+    # Skip silence before transcribing; defaults to VAD_ENABLED
+    vad: Optional[bool] = None
+
+class ProfileStats(BaseModel):
+    profile: str
+    jobs: int
+    audio_seconds: float
+    transcribe_seconds: float
+    avg_rtf: float
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    filename: str
+    total_size: int
+    received_bytes: int
+    status: str
+    chunk_size: int
+
+class JobResponse(BaseModel):
+    job_id: str
+    file_id: str
+    filename: str
+    status: str
+    progress: float = 0.0
+    transcript: Optional[str] = None
+    error: Optional[str] = None
+    profile: Optional[str] = None
+    vad: Optional[bool] = None
+    cache_hit: bool = False
+    audio_duration: Optional[float] = None
+    # Seconds of silence cut before transcribing
+    skipped_seconds: Optional[float] = None
+    transcribe_seconds: Optional[float] = None
+    rtf: Optional[float] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
 
 class ActionItem(BaseModel):
     task: str
@@ -26,6 +74,12 @@ class ProcessRequest(BaseModel):
     include_sentiment: bool = True
     include_timeline: bool = True
     language: str = "english"
+    mode: Literal["auto", "single", "chunked", "sectioned"] = "auto"
+    full_analysis: bool = False
+
+class BatchProcessRequest(BaseModel):
+    items: List[ProcessRequest]
+    concurrency: Optional[int] = Field(None, ge=1)
 
 class ProcessResponse(BaseModel):
     meeting_date: str | None = ""
@@ -36,3 +90,45 @@ class ProcessResponse(BaseModel):
     timeline: List[TimelineItem]
     action_items: List[ActionItem]
     speaker_sentiment: Dict[str, str]
+    # Sections that failed in "sectioned" mode (and came back empty), with the reason
+    errors: Dict[str, str] = Field(default_factory=dict)
+    # Id of the stored meeting (GET /meetings/{id}); None if it could not be stored
+    meeting_id: Optional[int] = None
+
+class StoredActionItem(ActionItem):
+    id: int
+    meeting_id: int
+    meeting_title: Optional[str] = None
+    meeting_date: Optional[str] = None
+
+class ActionItemPage(BaseModel):
+    items: List[StoredActionItem]
+    next_cursor: Optional[str] = None
+
+class MeetingSummary(BaseModel):
+    id: int
+    meeting_title: Optional[str] = None
+    meeting_date: Optional[str] = None
+    action_items: int
+    created_at: Optional[str] = None
+
+class MeetingPage(BaseModel):
+    items: List[MeetingSummary]
+    next_cursor: Optional[str] = None
+
+class SearchHit(BaseModel):
+    kind: Literal["segment", "summary", "action_item"]
+    title: Optional[str] = None
+    snippet: str
+    score: float
+    # segment hits: the transcription job and where in the recording to jump to
+    job_id: Optional[str] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    timestamp: Optional[str] = None
+    # summary and action item hits
+    meeting_id: Optional[int] = None
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchHit]
@@ -0,0 +1,256 @@
+"""
+Admission control: bounded lanes for work that is expensive to run concurrently,
+and token buckets that pace LLM calls to the provider's RPM/TPM quota.
+Work that cannot be admitted fails fast with Overloaded (HTTP 429 + Retry-After)
+instead of piling up until requests time out.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from backend.core.config import settings
+from backend.core.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger("admission")
+
+ADMISSION_ACTIVE = Gauge("admission_active", "Admitted requests running per lane", ("lane",))
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for a slot per lane", ("lane",))
+ADMISSION_REJECTED = Counter("admission_rejected_total", "Requests rejected with 429 per lane", ("lane",))
+RATE_LIMIT_WAIT = Histogram("llm_rate_limit_wait_seconds", "Time LLM calls waited for RPM/TPM budget", ("model",))
+
+# Assumed time a slot is held before any request has finished
+DEFAULT_SERVICE_SECONDS = 10.0
+
+
+class Overloaded(Exception):
+    """Raised when work is refused for lack of capacity; `retry_after` is in whole seconds."""
+
+    status_code = 429
+
+    def __init__(self, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+# ---------------- Lanes ----------------
+
+class Lane:
+    """
+    At most `max_active` holders at once and at most `max_queued` waiting in FIFO
+    order; past that, acquire() raises Overloaded. 0 disables either limit.
+    Used from the event loop only.
+    """
+
+    def __init__(self, name: str, max_active: int, max_queued: int):
+        self.name = name
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.active = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Moving average of how long a slot is held, for Retry-After
+        self._service_seconds = DEFAULT_SERVICE_SECONDS
+
+    def _report(self):
+        ADMISSION_ACTIVE.set(self.active, lane=self.name)
+        ADMISSION_QUEUED.set(len(self._waiters), lane=self.name)
+
+    def retry_after(self) -> float:
+        slots = self.max_active or 1
+        return self._service_seconds * (len(self._waiters) + 1) / slots
+
+    def check(self):
+        """Raises Overloaded if a new request would find both the lane and its queue full."""
+        full = self.max_active and self.active >= self.max_active
+        if full and self.max_queued and len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            ADMISSION_REJECTED.inc(lane=self.name)
+            raise Overloaded(f"Too many {self.name} requests in progress; retry later", self.retry_after())
+
+    async def acquire(self, bounded: bool = True):
+        """
+        Takes a slot, waiting for one if needed. With `bounded=False` the caller
+        waits even when the queue is full (for callers that limit themselves).
+        """
+        if not self.max_active or (self.active < self.max_active and not self._waiters):
+            self.active += 1
+            self._report()
+            return
+
+        if bounded:
+            self.check()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                self._report()
+            raise
+
+    def release(self, held_seconds: float | None = None):
+        if held_seconds is not None:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * held_seconds
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; `active` is unchanged
+                waiter.set_result(None)
+                self._report()
+                return
+        self.active -= 1
+        self._report()
+
+    @asynccontextmanager
+    async def admit(self, bounded: bool = True):
+        await self.acquire(bounded)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_active": self.max_active,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+        }
+
+
+# ---------------- Token buckets ----------------
+
+class TokenBucket:
+    """
+    `rate_per_minute` tokens refill continuously up to one minute's worth. Callers
+    take tokens as soon as they book a call, going into debt if needed, so each
+    later caller waits for the earlier debt too and calls go out in FIFO order.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A request larger than the whole bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class LLMRateLimiter:
+    """
+    Paces provider calls per model to LLM_RPM_LIMIT requests and LLM_TPM_LIMIT tokens
+    per minute (0 = unlimited). A call whose wait would exceed LLM_RATE_MAX_WAIT_SECONDS
+    is refused with Overloaded instead. Thread-safe, usable from sync and async code.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_wait: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_wait = max_wait
+        self._buckets: dict[str, tuple[TokenBucket | None, TokenBucket | None]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm)
+
+    def _buckets_for(self, model: str):
+        if model not in self._buckets:
+            self._buckets[model] = (
+                TokenBucket(self.rpm) if self.rpm else None,
+                TokenBucket(self.tpm) if self.tpm else None,
+            )
+        return self._buckets[model]
+
+    def _wait(self, model: str, tokens: int) -> float:
+        requests_bucket, tokens_bucket = self._buckets_for(model)
+        now = time.monotonic()
+        return max(
+            requests_bucket.wait_for(1, now) if requests_bucket else 0.0,
+            tokens_bucket.wait_for(tokens, now) if tokens_bucket else 0.0,
+        )
+
+    def _take(self, model: str, tokens: int):
+        requests_bucket, tokens_bucket = self._buckets_for(model)
+        if requests_bucket:
+            requests_bucket.take(1)
+        if tokens_bucket:
+            tokens_bucket.take(tokens)
+
+    def reserve(self, model: str, tokens: int) -> float:
+        """Books one request of `tokens` tokens and returns the seconds to wait before sending it."""
+        with self._lock:
+            wait = self._wait(model, tokens)
+            if wait > self.max_wait:
+                ADMISSION_REJECTED.inc(lane="llm_rate")
+                raise Overloaded(f"LLM rate limit for {model} reached; retry later", wait)
+            self._take(model, tokens)
+        RATE_LIMIT_WAIT.observe(wait, model=model)
+        return wait
+
+    def try_reserve(self, model: str, tokens: int) -> bool:
+        """Books a request only if it can be sent right away; for optional calls such as hedges."""
+        if not self.enabled:
+            return True
+        with self._lock:
+            if self._wait(model, tokens) > 0:
+                return False
+            self._take(model, tokens)
+        return True
+
+    async def acquire(self, model: str, tokens: int):
+        if not self.enabled:
+            return
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            logger.info(f"Waiting {wait:.2f}s for {model} rate limit budget")
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, model: str, tokens: int):
+        if not self.enabled:
+            return
+        wait = self.reserve(model, tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            result = {}
+            for model, (requests_bucket, tokens_bucket) in self._buckets.items():
+                for bucket in (requests_bucket, tokens_bucket):
+                    if bucket:
+                        bucket._refill(now)
+                result[model] = {
+                    "requests_available": round(requests_bucket.tokens, 2) if requests_bucket else None,
+                    "tokens_available": round(tokens_bucket.tokens) if tokens_bucket else None,
+                }
+        return {"rpm_limit": self.rpm, "tpm_limit": self.tpm, "models": result}
+
+
+llm_lane = Lane("llm", settings.LLM_MAX_CONCURRENT_REQUESTS, settings.LLM_MAX_QUEUED_REQUESTS)
+llm_rate_limiter = LLMRateLimiter(settings.LLM_RPM_LIMIT, settings.LLM_TPM_LIMIT, settings.LLM_RATE_MAX_WAIT_SECONDS)
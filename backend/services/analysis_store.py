@@ -0,0 +1,84 @@
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models import AnalysisResult
+
+logger = logging.getLogger("analysis_store")
+
+# Trim the table once every this many writes instead of on each one
+EVICT_EVERY_PUTS = 50
+
+_puts = 0
+_lock = threading.Lock()
+
+
+def transcript_sha256(transcript: str) -> str:
+    return hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+
+
+def analysis_key(req) -> str:
+    """Full analyses depend only on the transcript, meeting title and date, language and speaker handling."""
+    fingerprint = "\0".join([
+        transcript_sha256(req.transcript),
+        req.meeting_title or "",
+        req.meeting_date or "",
+        req.language,
+        "speakers" if req.include_speakers else "no-speakers",
+    ])
+    return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> Optional[dict]:
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        entry = db.get(AnalysisResult, key)
+        if entry is None or _aware(entry.created_at) <= now - timedelta(seconds=settings.ANALYSIS_STORE_TTL_SECONDS):
+            return None
+        entry.last_accessed_at = now
+        result = entry.result
+        db.commit()
+        return json.loads(result)
+
+
+def put(key: str, result: dict):
+    global _puts
+    now = datetime.now(timezone.utc)
+    with _lock:
+        _puts += 1
+        evict = _puts % EVICT_EVERY_PUTS == 0
+    with SessionLocal() as db:
+        db.merge(AnalysisResult(key=key, result=json.dumps(result), created_at=now, last_accessed_at=now))
+        db.commit()
+        if evict:
+            _evict(db, now)
+
+
+def _evict(db, now: datetime):
+    expired = (
+        db.query(AnalysisResult)
+        .filter(AnalysisResult.created_at <= now - timedelta(seconds=settings.ANALYSIS_STORE_TTL_SECONDS))
+        .delete(synchronize_session=False)
+    )
+    overflow = db.query(AnalysisResult).count() - settings.ANALYSIS_STORE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = [
+            key for (key,) in
+            db.query(AnalysisResult.key)
+            .order_by(func.coalesce(AnalysisResult.last_accessed_at, AnalysisResult.created_at))
+            .limit(overflow)
+        ]
+        db.query(AnalysisResult).filter(AnalysisResult.key.in_(oldest)).delete(synchronize_session=False)
+    db.commit()
+    if expired or overflow > 0:
+        logger.info(f"Evicted {expired} expired and {max(overflow, 0)} least recently used full analyses")
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands datetimes back without tzinfo; they are stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -0,0 +1,136 @@
+import bisect
+import logging
+import ffmpeg
+import numpy as np
+from backend.core.config import settings
+
+logger = logging.getLogger("audio_preprocess")
+
+# Whisper works on 16 kHz mono
+SAMPLE_RATE = 16000
+# Energy VAD frame length (30 ms)
+FRAME_SAMPLES = 480
+
+
+def load_audio(path: str) -> np.ndarray:
+    """
+    Decodes any supported audio file once to 16 kHz mono float32 samples in [-1, 1].
+    Uses the ffmpeg CLI when it is installed and faster-whisper's bundled decoder otherwise.
+    """
+    try:
+        out, _ = (
+            ffmpeg.input(path)
+            .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=SAMPLE_RATE)
+            .run(capture_stdout=True, capture_stderr=True)
+        )
+    except FileNotFoundError:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(f"Could not decode audio: {stderr[-1] if stderr else e}")
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def detect_speech(audio: np.ndarray) -> list[tuple[int, int]]:
+    """
+    Energy-based voice activity detection. Returns (start, end) sample ranges to keep:
+    every frame louder than VAD_THRESHOLD_DB, padded by VAD_PADDING_SECONDS, with
+    gaps shorter than VAD_MIN_SILENCE_SECONDS kept as well.
+    """
+    n_frames = len(audio) // FRAME_SAMPLES
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    db = 20 * np.log10(np.maximum(rms, 1e-10))
+    voiced = np.flatnonzero(db > settings.VAD_THRESHOLD_DB)
+    if len(voiced) == 0:
+        return []
+
+    padding = int(settings.VAD_PADDING_SECONDS * SAMPLE_RATE)
+    min_gap = int(settings.VAD_MIN_SILENCE_SECONDS * SAMPLE_RATE)
+    regions: list[list[int]] = []
+    for frame in voiced.tolist():
+        start = max(0, frame * FRAME_SAMPLES - padding)
+        end = min(len(audio), (frame + 1) * FRAME_SAMPLES + padding)
+        if regions and start - regions[-1][1] < min_gap:
+            regions[-1][1] = max(regions[-1][1], end)
+        else:
+            regions.append([start, end])
+    # A trailing partial frame belongs to the last region if it touches it
+    if regions and len(audio) - regions[-1][1] < min_gap:
+        regions[-1][1] = len(audio)
+    return [(start, end) for start, end in regions]
+
+
+def find_split_points(audio: np.ndarray, shard_samples: int) -> list[int]:
+    """
+    Sample offsets that cut `audio` into shards of about `shard_samples`. Each cut is
+    moved to the quietest 30 ms frame within a quarter shard of its target, so shards
+    end in a pause rather than mid-word.
+    """
+    n_frames = len(audio) // FRAME_SAMPLES
+    if shard_samples <= 0 or len(audio) <= shard_samples:
+        return []
+    frames = audio[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    energy = np.mean(frames ** 2, axis=1)
+
+    shard_frames = shard_samples // FRAME_SAMPLES
+    window = max(1, shard_frames // 4)
+    points, last = [], 0
+    target = shard_frames
+    while target < n_frames - window:
+        lo, hi = max(last + 1, target - window), min(n_frames, target + window)
+        cut = lo + int(np.argmin(energy[lo:hi]))
+        points.append(cut * FRAME_SAMPLES)
+        last = cut
+        target = cut + shard_frames
+    return points
+
+
+class TimestampMap:
+    """Maps times in the silence-stripped audio back to the original recording."""
+
+    def __init__(self, regions: list[tuple[int, int]]):
+        # Start of each kept region in the stripped audio and in the original, in seconds
+        self.stripped_starts: list[float] = []
+        self.original_starts: list[float] = []
+        self.lengths: list[float] = []
+        position = 0
+        for start, end in regions:
+            self.stripped_starts.append(position / SAMPLE_RATE)
+            self.original_starts.append(start / SAMPLE_RATE)
+            self.lengths.append((end - start) / SAMPLE_RATE)
+            position += end - start
+
+    def to_original(self, t: float, is_end: bool = False) -> float:
+        """
+        Original time of stripped time `t`. A time exactly on the seam between two
+        regions maps to the end of the earlier one when `is_end` is set, so a
+        segment never stretches over the silence that was cut after it.
+        """
+        if not self.stripped_starts:
+            return t
+        find = bisect.bisect_left if is_end else bisect.bisect_right
+        i = max(0, find(self.stripped_starts, t) - 1)
+        offset = min(t - self.stripped_starts[i], self.lengths[i])
+        return self.original_starts[i] + offset
+
+
+def preprocess(path: str, vad: bool) -> tuple[np.ndarray, TimestampMap | None, float, float]:
+    """
+    Decodes `path` and, if `vad` is set, removes silence.
+    Returns (audio, timestamp map or None, original duration, seconds skipped).
+    """
+    audio = load_audio(path)
+    duration = len(audio) / SAMPLE_RATE
+    if not vad:
+        return audio, None, duration, 0.0
+
+    regions = detect_speech(audio)
+    speech = np.concatenate([audio[start:end] for start, end in regions]) if regions else audio[:0]
+    skipped = duration - len(speech) / SAMPLE_RATE
+    logger.info(f"VAD kept {len(speech) / SAMPLE_RATE:.1f}s of {duration:.1f}s ({len(regions)} region(s))")
+    return speech, TimestampMap(regions), duration, skipped
@@ -1,19 +1,244 @@
-from faster_whisper import WhisperModel
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+import numpy as np
+from backend.core.config import settings
+from backend.core.metrics import Counter, Histogram
+from backend.core.startup import lazy_import
+from backend.services.audio_preprocess import SAMPLE_RATE, TimestampMap, find_split_points, preprocess
+from backend.utils.segments import format_segment
+
+logger = logging.getLogger("audio_transcribe")
 
 _model = None
+_shard_pool = None
+_shard_pool_lock = threading.Lock()
+
+# Decoding options per speed profile, from greedy to full beam search
+PROFILES = {
+    "fast": {"beam_size": 1, "best_of": 1, "temperature": 0.0, "condition_on_previous_text": False},
+    "balanced": {"beam_size": 3, "best_of": 3},
+    "accurate": {"beam_size": 5, "best_of": 5},
+}
+
+# Words compared when removing text repeated across a shard boundary
+BOUNDARY_MAX_WORDS = 12
+WORD_RE = re.compile(r"[\w']+")
+
+AUDIO_DURATION = Histogram(
+    "transcription_audio_seconds", "Duration of transcribed recordings", ("profile",),
+    buckets=(10, 30, 60, 300, 600, 1200, 1800, 3600, 7200, 14400),
+)
+TRANSCRIBE_SECONDS = Histogram(
+    "transcription_wall_seconds", "Wall time of transcribe_audio, decoding included", ("profile",),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+TRANSCRIBE_RTF = Histogram(
+    "transcription_real_time_factor", "Wall time divided by audio duration", ("profile",),
+    buckets=(0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 5),
+)
+SKIPPED_SECONDS = Counter("transcription_skipped_seconds_total", "Seconds of silence cut before Whisper")
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
+
+def _load_model(cpu_threads: int, num_workers: int) -> "WhisperModel":
+    # CTranslate2 is only loaded by processes that transcribe
+    WhisperModel = lazy_import("faster_whisper").WhisperModel
+    return WhisperModel(
+        settings.WHISPER_MODEL_SIZE,
+        device=settings.WHISPER_DEVICE,
+        compute_type=settings.WHISPER_COMPUTE_TYPE,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
 
 def get_model():
     global _model
     if _model is None:
-        _model = WhisperModel("small", device="cpu")
+        _model = _load_model(settings.WHISPER_CPU_THREADS, settings.WHISPER_NUM_WORKERS)
     return _model
 
-def transcribe_audio(filepath: str) -> str:
+def warm_up_model():
+    """Loads the model and runs it once on a second of silence, so the first request doesn't pay for it."""
+    started = time.perf_counter()
     model = get_model()
-    segments, _ = model.transcribe(filepath, beam_size=5)
-    
-    transcript = "\n".join(
-        f"[{seg.start:.2f} - {seg.end:.2f}] {seg.text.strip()}"
-        for seg in segments
+    segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1)
+    list(segments)
+    logger.info(
+        f"Whisper model '{settings.WHISPER_MODEL_SIZE}' ({settings.WHISPER_COMPUTE_TYPE}) "
+        f"warmed up in {time.perf_counter() - started:.2f}s"
     )
-    return transcript
+
+def resolve_profile(profile: str | None) -> str:
+    profile = profile or settings.WHISPER_DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown transcription profile '{profile}'. Use one of: {', '.join(PROFILES)}")
+    return profile
+
+def _make_segment(start: float, end: float, text: str, progress: float, timestamp_map: TimestampMap | None) -> dict:
+    if timestamp_map is not None:
+        start, end = timestamp_map.to_original(start), timestamp_map.to_original(end, is_end=True)
+    return {
+        "start": round(start, 2),
+        "end": round(end, 2),
+        "text": text,
+        "line": format_segment(start, end, text),
+        "progress": progress,
+    }
+
+def transcribe_segments(audio, profile: str, timestamp_map: TimestampMap | None = None):
+    """
+    Starts a transcription of `audio` (a file path or 16 kHz samples) and returns
+    (segments, audio_duration). `segments` yields each segment as soon as faster-whisper
+    produces it, with the fraction of the audio transcribed so far. With a
+    `timestamp_map`, segment times are mapped back to the original recording.
+    """
+    model = get_model()
+    segments, info = model.transcribe(audio, **PROFILES[profile])
+
+    def iter_segments():
+        for seg in segments:
+            progress = min(seg.end / info.duration, 1.0) if info.duration else 0.0
+            yield _make_segment(seg.start, seg.end, seg.text.strip(), progress, timestamp_map)
+
+    return iter_segments(), info.duration
+
+# ---------------- Sharded transcription ----------------
+
+def _init_shard_worker(cpu_threads: int):
+    # Runs once in each pool process: every worker owns one model
+    global _model
+    _model = _load_model(cpu_threads, 1)
+
+def _transcribe_shard(audio: np.ndarray, profile: str) -> list[tuple[float, float, str]]:
+    segments, _ = get_model().transcribe(audio, **PROFILES[profile])
+    return [(seg.start, seg.end, seg.text.strip()) for seg in segments]
+
+def get_shard_pool() -> ProcessPoolExecutor:
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is None:
+            workers = settings.WHISPER_SHARD_WORKERS
+            # Split the cores between the workers instead of letting each take them all
+            cpu_threads = settings.WHISPER_CPU_THREADS or max(1, (os.cpu_count() or 1) // workers)
+            _shard_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # fork would copy the server's threads and locks into the workers
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_shard_worker,
+                initargs=(cpu_threads,),
+            )
+            logger.info(f"Started {workers} transcription shard worker(s) with {cpu_threads} thread(s) each")
+        return _shard_pool
+
+def shutdown_shard_pool():
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is not None:
+            _shard_pool.shutdown(wait=False, cancel_futures=True)
+            _shard_pool = None
+
+def use_sharding(audio_seconds: float) -> bool:
+    return settings.WHISPER_SHARD_WORKERS > 1 and audio_seconds >= settings.WHISPER_SHARD_MIN_SECONDS
+
+def dedupe_boundary(previous: str, text: str) -> str:
+    """
+    Removes words at the start of `text` that repeat the end of `previous`, which
+    Whisper produces when a phrase near a shard cut is heard by both shards.
+    """
+    prev_words = WORD_RE.findall(previous.lower())
+    words = text.split()
+    norm = [" ".join(WORD_RE.findall(w.lower())) for w in words]
+    for k in range(min(BOUNDARY_MAX_WORDS, len(prev_words), len(words)), 0, -1):
+        # Single-word repeats ("the", "and") are usually genuine; require two unless the whole segment repeats
+        if k < 2 and k < len(words):
+            break
+        if prev_words[-k:] == norm[:k]:
+            return " ".join(words[k:])
+    return text
+
+def transcribe_sharded(audio: np.ndarray, profile: str, timestamp_map: TimestampMap | None = None):
+    """
+    Splits `audio` at silences into shards of about WHISPER_SHARD_SECONDS, transcribes
+    them in parallel in the shard pool and yields the segments in order, shifted by
+    their shard's offset (and through `timestamp_map`) with boundary repeats removed.
+    Segments are yielded as soon as all shards before them are done.
+    """
+    bounds = [0] + find_split_points(audio, int(settings.WHISPER_SHARD_SECONDS * SAMPLE_RATE)) + [len(audio)]
+    shards = list(zip(bounds[:-1], bounds[1:]))
+    total = len(audio) / SAMPLE_RATE
+    logger.info(f"Transcribing {total:.1f}s of audio in {len(shards)} shard(s)")
+
+    pool = get_shard_pool()
+    futures = [pool.submit(_transcribe_shard, audio[start:end], profile) for start, end in shards]
+    previous = ""
+    try:
+        for (shard_start, _), future in zip(shards, futures):
+            offset = shard_start / SAMPLE_RATE
+            for i, (start, end, text) in enumerate(future.result()):
+                if i == 0:
+                    text = dedupe_boundary(previous, text)
+                if not text:
+                    continue
+                progress = min((offset + end) / total, 1.0) if total else 0.0
+                yield _make_segment(offset + start, offset + end, text, progress, timestamp_map)
+                previous = text
+    finally:
+        # The job failed or the caller stopped early: don't keep the workers busy
+        for future in futures:
+            future.cancel()
+
+def transcribe_audio(filepath: str, profile: str | None = None, on_segment=None, vad: bool | None = None) -> dict:
+    """
+    Transcribes an audio file into "[start - end] text" lines.
+    The file is decoded once and, with `vad` (default VAD_ENABLED), long silences are
+    cut before Whisper runs; timestamps still refer to the original recording.
+    `on_segment` is called with every segment dict as it is produced.
+    Returns the transcript with the profile used, its real-time factor and the
+    seconds of silence skipped.
+    """
+    profile = resolve_profile(profile)
+    vad = settings.VAD_ENABLED if vad is None else vad
+    started = time.perf_counter()
+    audio, timestamp_map, duration, skipped = preprocess(filepath, vad)
+
+    if len(audio) and use_sharding(len(audio) / SAMPLE_RATE):
+        segments = transcribe_sharded(audio, profile, timestamp_map)
+    elif len(audio):
+        segments, _ = transcribe_segments(audio, profile, timestamp_map)
+    else:
+        # Nothing but silence
+        segments = iter(())
+
+    lines = []
+    for segment in segments:
+        lines.append(segment["line"])
+        if on_segment:
+            on_segment(segment)
+
+    elapsed = time.perf_counter() - started
+    rtf = elapsed / duration if duration else None
+    TRANSCRIBE_SECONDS.observe(elapsed, profile=profile)
+    if duration:
+        AUDIO_DURATION.observe(duration, profile=profile)
+        TRANSCRIBE_RTF.observe(rtf, profile=profile)
+    SKIPPED_SECONDS.inc(skipped)
+    logger.info(
+        f"Transcribed {duration or 0:.1f}s of audio in {elapsed:.1f}s "
+        f"(profile={profile}, skipped {skipped:.1f}s of silence, rtf={'n/a' if rtf is None else f'{rtf:.3f}'})"
+    )
+
+    return {
+        "transcript": "\n".join(lines),
+        "profile": profile,
+        "audio_duration": duration,
+        "skipped_seconds": round(skipped, 2),
+        "elapsed_seconds": elapsed,
+        "rtf": rtf,
+    }
@@ -0,0 +1,520 @@
+import asyncio
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import requests
+from sqlalchemy import func
+
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.core.metrics import Counter, Gauge
+from backend.core.tracing import span
+from backend.models import TranscriptionJob
+from backend.services import search_index, transcript_cache
+from backend.services.admission import ADMISSION_REJECTED, Overloaded
+from backend.utils.segments import parse_segment_line
+
+logger = logging.getLogger("job_queue")
+
+# Don't hit the database for every single segment of a long recording
+PROGRESS_WRITE_STEP = 0.02
+# How long a stream waits for new segments before re-checking the job
+STREAM_WAIT_SECONDS = 1.0
+# Assumed transcription time per job until one has finished, for Retry-After
+DEFAULT_JOB_SECONDS = 60.0
+# Sweeps per JOB_STALE_SECONDS; each also marks this process's running jobs as alive
+SWEEPS_PER_STALE_PERIOD = 4
+
+JOBS_FINISHED = Counter(
+    "transcription_jobs_total", "Transcription jobs by outcome: done, failed or cache_hit", ("outcome",)
+)
+JOBS_RUNNING = Gauge("transcription_jobs_in_flight", "Transcription jobs running in this process")
+
+
+def job_to_dict(job: TranscriptionJob) -> dict:
+    return {
+        "job_id": job.id,
+        "file_id": job.file_id,
+        "filename": job.filename,
+        "status": job.status,
+        "progress": round(job.progress or 0.0, 4),
+        "transcript": job.transcript if job.status == "done" else None,
+        "error": job.error,
+        "profile": job.profile,
+        "vad": job.vad,
+        "cache_hit": bool(job.cache_hit),
+        "audio_duration": job.audio_duration,
+        "skipped_seconds": job.skipped_seconds,
+        "transcribe_seconds": job.transcribe_seconds,
+        "rtf": job.rtf,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class SegmentFeed:
+    """
+    Segments of a job running in this process, for live streaming to clients.
+    Pushed from a worker thread and awaited on the event loop, so a waiting stream
+    holds no thread.
+    """
+
+    def __init__(self):
+        self.segments: list[dict] = []
+        self.finished = False
+        self._lock = threading.Lock()
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    def _wake(self):
+        for loop, event in self._waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The waiter's loop has closed
+                pass
+
+    def push(self, segment: dict):
+        with self._lock:
+            self.segments.append(segment)
+            self._wake()
+
+    def close(self):
+        with self._lock:
+            self.finished = True
+            self._wake()
+
+    async def wait(self, cursor: int, timeout: float) -> tuple[list[dict], bool]:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if len(self.segments) > cursor or self.finished:
+                return self.segments[cursor:], self.finished
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        with self._lock:
+            return self.segments[cursor:], self.finished
+
+
+class JobQueue:
+    """
+    Bounded pool of transcription worker threads backed by the jobs table.
+    Jobs are claimed from the database, so queued work survives a restart.
+    The audio helpers (numpy, ffmpeg) are imported where they are used, so
+    processes that only read jobs, such as the llm role, never load them.
+    """
+
+    def __init__(self, workers: int, poll_interval: float):
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._feeds: dict[str, SegmentFeed] = {}
+        self._feeds_lock = threading.Lock()
+        # Moving average of transcription wall time, for Retry-After estimates
+        self._job_seconds = DEFAULT_JOB_SECONDS
+        self.rejected = 0
+
+    # ---------- Lifecycle ----------
+    def start(self):
+        if self._threads:
+            return
+        self._stopping.clear()
+        self.requeue_stale()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"transcribe-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        # Jobs orphaned while this process runs (e.g. another process restarted) are
+        # only stale JOB_STALE_SECONDS after their claim, so the sweep has to repeat
+        t = threading.Thread(target=self._sweep_loop, name="transcribe-sweeper", daemon=True)
+        t.start()
+        self._threads.append(t)
+        logger.info(f"Started {self.workers} transcription worker(s)")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wakeup.set()
+        for t in self._threads:
+            t.join(timeout=timeout)
+        self._threads = []
+
+    # ---------- Producer side ----------
+    def enqueue(
+        self,
+        file_id: str,
+        filename: str,
+        path: str,
+        callback_url: Optional[str] = None,
+        profile: Optional[str] = None,
+        audio_sha256: Optional[str] = None,
+        vad: Optional[bool] = None,
+        admit: bool = True,
+    ) -> dict:
+        """
+        Queues a transcription job. If the same audio was already transcribed with the
+        same model, profile and silence handling, the job is created finished from the
+        transcript cache. `vad` defaults to VAD_ENABLED.
+        Raises Overloaded when TRANSCRIBE_MAX_QUEUED jobs are already waiting, unless
+        `admit` is False because the caller has checked capacity itself.
+        """
+        from backend.services.audio_transcribe import resolve_profile
+
+        profile = resolve_profile(profile)
+        vad = settings.VAD_ENABLED if vad is None else vad
+        cached = self._cached(audio_sha256, profile, vad)
+        if cached is None and admit:
+            self.check_capacity()
+
+        with SessionLocal() as db:
+            job = TranscriptionJob(
+                id=str(uuid.uuid4()),
+                file_id=file_id,
+                filename=filename,
+                path=path,
+                status="queued",
+                callback_url=callback_url,
+                profile=profile,
+                audio_sha256=audio_sha256,
+                vad=vad,
+                cache_hit=cached is not None,
+            )
+            if cached is not None:
+                now = datetime.now(timezone.utc)
+                job.status = "done"
+                job.progress = 1.0
+                job.transcript = cached["transcript"]
+                job.audio_duration = cached["audio_duration"]
+                job.skipped_seconds = cached["skipped_seconds"]
+                job.started_at = job.finished_at = now
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            result = job_to_dict(job)
+
+        if cached is not None:
+            JOBS_FINISHED.inc(outcome="cache_hit")
+            logger.info(f"Transcript cache hit for job {result['job_id']}")
+            self._index(result["job_id"], filename, cached["transcript"])
+            if callback_url:
+                threading.Thread(target=self._notify, args=(result["job_id"],), daemon=True).start()
+        else:
+            self._wakeup.set()
+        return result
+
+    def _cached(self, audio_sha256: Optional[str], profile: str, vad: bool) -> Optional[dict]:
+        return transcript_cache.get(transcript_cache.cache_key(audio_sha256, profile, vad)) if audio_sha256 else None
+
+    def check_admission(self, audio_sha256: str, profile: Optional[str] = None, vad: Optional[bool] = None):
+        """check_capacity, skipped for audio the transcript cache already answers."""
+        from backend.services.audio_transcribe import resolve_profile
+
+        profile = resolve_profile(profile)
+        vad = settings.VAD_ENABLED if vad is None else vad
+        if self._cached(audio_sha256, profile, vad) is None:
+            self.check_capacity()
+
+    def check_capacity(self):
+        """Raises Overloaded if TRANSCRIBE_MAX_QUEUED jobs are already waiting for a worker."""
+        if not settings.TRANSCRIBE_MAX_QUEUED or self.queued_count() < settings.TRANSCRIBE_MAX_QUEUED:
+            return
+        self.rejected += 1
+        ADMISSION_REJECTED.inc(lane="transcription")
+        # A queue slot frees up whenever any worker finishes a job
+        raise Overloaded("Transcription queue is full; retry later", self._job_seconds / self.workers)
+
+    def capacity_stats(self) -> dict:
+        return {
+            "queued": self.queued_count(),
+            "running": int(JOBS_RUNNING.value()),
+            "workers": self.workers,
+            "max_queued": settings.TRANSCRIBE_MAX_QUEUED,
+            "rejected": self.rejected,
+            "avg_job_seconds": round(self._job_seconds, 2),
+        }
+
+    def queued_count(self) -> int:
+        """Jobs waiting for a worker, across all processes sharing the database."""
+        with SessionLocal() as db:
+            return db.query(func.count(TranscriptionJob.id)).filter(TranscriptionJob.status == "queued").scalar()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with SessionLocal() as db:
+            job = db.get(TranscriptionJob, job_id)
+            return job_to_dict(job) if job else None
+
+    def profile_stats(self) -> list[dict]:
+        """Average real-time factor of finished jobs, per transcription profile."""
+        with SessionLocal() as db:
+            rows = (
+                db.query(
+                    TranscriptionJob.profile,
+                    func.count(TranscriptionJob.id),
+                    func.sum(TranscriptionJob.audio_duration),
+                    func.sum(TranscriptionJob.transcribe_seconds),
+                    func.avg(TranscriptionJob.rtf),
+                )
+                .filter(TranscriptionJob.status == "done", TranscriptionJob.rtf.isnot(None))
+                .group_by(TranscriptionJob.profile)
+                .all()
+            )
+        return [
+            {
+                "profile": profile,
+                "jobs": jobs,
+                "audio_seconds": round(audio or 0.0, 2),
+                "transcribe_seconds": round(elapsed or 0.0, 2),
+                "avg_rtf": round(avg_rtf, 4),
+            }
+            for profile, jobs, audio, elapsed, avg_rtf in rows
+        ]
+
+    def latest_job_for_file(self, file_id: str) -> Optional[dict]:
+        with SessionLocal() as db:
+            job = (
+                db.query(TranscriptionJob)
+                .filter(TranscriptionJob.file_id == file_id)
+                .order_by(TranscriptionJob.created_at.desc())
+                .first()
+            )
+            return job_to_dict(job) if job else None
+
+    def _read_progress(self, job_id: str) -> tuple[str, float, list[str], Optional[str]]:
+        with SessionLocal() as db:
+            job = db.get(TranscriptionJob, job_id)
+            lines = job.transcript.splitlines() if job.transcript else []
+            return job.status, job.progress or 0.0, lines, job.error
+
+    async def stream_segments(self, job_id: str):
+        """
+        Yields stream events for a job: "status" while it waits, one "segment" per
+        transcribed segment as soon as it exists, then "done" or "error".
+        Jobs running in this process are followed live; otherwise the partial
+        transcript stored with the job is polled.
+        """
+        cursor = 0
+        last_status = None
+        while True:
+            with self._feeds_lock:
+                feed = self._feeds.get(job_id)
+
+            if feed is not None:
+                segments, finished = await feed.wait(cursor, STREAM_WAIT_SECONDS)
+                for segment in segments:
+                    yield {"type": "segment", "index": cursor, **segment}
+                    cursor += 1
+                if not finished:
+                    continue
+
+            status, progress, lines, error = await asyncio.to_thread(self._read_progress, job_id)
+            if status != last_status and status in ("queued", "running"):
+                last_status = status
+                yield {"type": "status", "status": status, "progress": round(progress, 4)}
+
+            for line in lines[cursor:]:
+                segment = parse_segment_line(line) or {"text": line, "line": line}
+                yield {"type": "segment", "index": cursor, "progress": round(progress, 4), **segment}
+                cursor += 1
+
+            if status == "done":
+                yield {"type": "done", "progress": 1.0, "segments": cursor}
+                return
+            if status == "failed":
+                yield {"type": "error", "error": error}
+                return
+            if feed is None:
+                await asyncio.sleep(STREAM_WAIT_SECONDS)
+
+    def heartbeat(self):
+        """Marks the jobs running in this process as alive, so no sweep takes them for stale."""
+        with self._feeds_lock:
+            job_ids = list(self._feeds)
+        if not job_ids:
+            return
+        with SessionLocal() as db:
+            db.query(TranscriptionJob).filter(
+                TranscriptionJob.id.in_(job_ids), TranscriptionJob.status == "running"
+            ).update({"updated_at": datetime.now(timezone.utc)}, synchronize_session=False)
+            db.commit()
+
+    def requeue_stale(self) -> int:
+        """Put jobs whose worker died mid-run (e.g. a restart) back in the queue."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_STALE_SECONDS)
+        with SessionLocal() as db:
+            count = (
+                db.query(TranscriptionJob)
+                .filter(TranscriptionJob.status == "running", TranscriptionJob.updated_at < cutoff)
+                .update({"status": "queued", "progress": 0.0, "transcript": None}, synchronize_session=False)
+            )
+            db.commit()
+        if count:
+            logger.info(f"Re-queued {count} stale transcription job(s)")
+        return count
+
+    # ---------- Consumer side ----------
+    def _claim_next(self) -> Optional[str]:
+        with SessionLocal() as db:
+            while True:
+                job = (
+                    db.query(TranscriptionJob)
+                    .filter(TranscriptionJob.status == "queued")
+                    .order_by(TranscriptionJob.created_at)
+                    .first()
+                )
+                if job is None:
+                    return None
+                now = datetime.now(timezone.utc)
+                # Conditional update so two workers can never claim the same job
+                claimed = (
+                    db.query(TranscriptionJob)
+                    .filter(TranscriptionJob.id == job.id, TranscriptionJob.status == "queued")
+                    .update(
+                        {
+                            "status": "running",
+                            "started_at": now,
+                            "updated_at": now,
+                            "attempts": TranscriptionJob.attempts + 1,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    return job.id
+
+    def _worker_loop(self):
+        while not self._stopping.is_set():
+            try:
+                job_id = self._claim_next()
+            except Exception as e:
+                logger.error(f"Failed to claim transcription job: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.wait(timeout=self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._run(job_id)
+
+    def _sweep_loop(self):
+        interval = max(1.0, settings.JOB_STALE_SECONDS / SWEEPS_PER_STALE_PERIOD)
+        while not self._stopping.wait(timeout=interval):
+            try:
+                self.heartbeat()
+                if self.requeue_stale():
+                    self._wakeup.set()
+            except Exception as e:
+                logger.error(f"Failed to sweep stale transcription jobs: {e}")
+
+    def _update(self, job_id: str, **fields):
+        with SessionLocal() as db:
+            db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).update(
+                {**fields, "updated_at": datetime.now(timezone.utc)}, synchronize_session=False
+            )
+            db.commit()
+
+    def _run(self, job_id: str):
+        feed = SegmentFeed()
+        with self._feeds_lock:
+            self._feeds[job_id] = feed
+
+        with SessionLocal() as db:
+            job = db.get(TranscriptionJob, job_id)
+            path, profile, audio_sha256, filename = job.path, job.profile, job.audio_sha256, job.filename
+            vad = job.vad
+
+        lines = []
+        last_written = 0.0
+
+        def on_segment(segment: dict):
+            nonlocal last_written
+            feed.push(segment)
+            lines.append(segment["line"])
+            progress = segment["progress"]
+            if progress - last_written >= PROGRESS_WRITE_STEP:
+                last_written = progress
+                # The partial transcript lets streams in other processes follow along
+                self._update(job_id, progress=progress, transcript="\n".join(lines))
+
+        from backend.services.audio_transcribe import transcribe_audio
+
+        logger.info(f"Transcribing job {job_id}")
+        JOBS_RUNNING.inc()
+        try:
+            # Worker threads start with an empty context, so each job is its own trace
+            with span("transcription", job_id=job_id, profile=profile) as current:
+                result = transcribe_audio(path, profile=profile, on_segment=on_segment, vad=vad)
+                current.set_attribute("audio_duration", result["audio_duration"])
+                current.set_attribute("rtf", result["rtf"])
+        except Exception as e:
+            JOBS_FINISHED.inc(outcome="failed")
+            logger.error(f"Transcription job {job_id} failed: {e}")
+            self._update(job_id, status="failed", error=str(e), finished_at=datetime.now(timezone.utc))
+        else:
+            JOBS_FINISHED.inc(outcome="done")
+            self._job_seconds = 0.8 * self._job_seconds + 0.2 * result["elapsed_seconds"]
+            self._update(
+                job_id,
+                status="done",
+                progress=1.0,
+                transcript=result["transcript"],
+                audio_duration=result["audio_duration"],
+                skipped_seconds=result["skipped_seconds"],
+                transcribe_seconds=result["elapsed_seconds"],
+                rtf=result["rtf"],
+                finished_at=datetime.now(timezone.utc),
+            )
+            logger.info(f"Transcription job {job_id} finished")
+            self._index(job_id, filename, result["transcript"])
+            if audio_sha256:
+                transcript_cache.put(
+                    transcript_cache.cache_key(audio_sha256, profile, vad),
+                    result["transcript"],
+                    result["audio_duration"],
+                    result["skipped_seconds"],
+                )
+        finally:
+            JOBS_RUNNING.dec()
+            feed.close()
+            with self._feeds_lock:
+                self._feeds.pop(job_id, None)
+
+        self._notify(job_id)
+
+    def _index(self, job_id: str, filename: str, transcript: str):
+        # Search is a convenience; a failure here must not fail the transcription
+        try:
+            search_index.index_transcript(job_id, filename, transcript)
+        except Exception as e:
+            logger.error(f"Failed to index job {job_id} for search: {e}")
+
+    def _notify(self, job_id: str):
+        with SessionLocal() as db:
+            job = db.get(TranscriptionJob, job_id)
+            callback_url = job.callback_url
+            payload = job_to_dict(job)
+        if not callback_url:
+            return
+        try:
+            requests.post(callback_url, json=payload, timeout=settings.JOB_CALLBACK_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.error(f"Callback for job {job_id} to {callback_url} failed: {e}")
+
+
+job_queue = JobQueue(
+    workers=settings.TRANSCRIBE_WORKERS,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+)
+JOBS_QUEUED = Gauge(
+    "transcription_jobs_queued", "Transcription jobs waiting for a worker", function=job_queue.queued_count
+)
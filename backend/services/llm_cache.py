@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models import LLMCacheEntry
+
+logger = logging.getLogger("llm_cache")
+
+# Trim the disk tier once every this many writes instead of on each one
+EVICT_EVERY_PUTS = 50
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM responses keyed by a fingerprint of prompt, model and temperature:
+    an in-memory LRU in front of a SQLite table, both with a TTL.
+    """
+
+    def __init__(self, memory_entries: int, max_entries: int, ttl_seconds: int):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self._memory: OrderedDict[str, tuple[str, datetime]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(prompt: str, model: str, temperature: float) -> str:
+        fingerprint = f"{model}\0{temperature}\0{prompt}".encode("utf-8")
+        return hashlib.sha256(fingerprint).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                value, expires_at = cached
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return value
+                del self._memory[key]
+
+        with SessionLocal() as db:
+            entry = db.get(LLMCacheEntry, key)
+            if entry is not None and _aware(entry.expires_at) > now:
+                entry.last_accessed_at = now
+                value, expires_at = entry.response, _aware(entry.expires_at)
+                db.commit()
+            else:
+                value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits_disk += 1
+            self._remember(key, value, expires_at)
+        return value
+
+    def put(self, key: str, value: str, model: str):
+        now = datetime.now(timezone.utc)
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY_PUTS == 0
+
+        with SessionLocal() as db:
+            entry = db.get(LLMCacheEntry, key)
+            if entry is None:
+                entry = LLMCacheEntry(key=key)
+                db.add(entry)
+            entry.response = value
+            entry.model = model
+            entry.expires_at = expires_at
+            entry.last_accessed_at = now
+            db.commit()
+            if evict:
+                self._evict(db, now)
+
+    def _remember(self, key: str, value: str, expires_at: datetime):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, db, now: datetime):
+        expired = db.query(LLMCacheEntry).filter(LLMCacheEntry.expires_at <= now).delete()
+        overflow = db.query(LLMCacheEntry).count() - self.max_entries
+        if overflow > 0:
+            oldest = [
+                key for (key,) in
+                db.query(LLMCacheEntry.key).order_by(LLMCacheEntry.last_accessed_at).limit(overflow)
+            ]
+            db.query(LLMCacheEntry).filter(LLMCacheEntry.key.in_(oldest)).delete(synchronize_session=False)
+        db.commit()
+        if expired or overflow > 0:
+            logger.info(f"Evicted {expired} expired and {max(overflow, 0)} least recently used LLM responses")
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": round((self.hits_memory + self.hits_disk) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands datetimes back without tzinfo; they are stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+llm_cache = LLMCache(
+    memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+)
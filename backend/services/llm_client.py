@@ -1,51 +1,423 @@
 import os
 import json
+import asyncio
 import logging
+import time
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from fastapi import Request
+from backend.core.config import settings
+from backend.core.metrics import Counter, Gauge, Histogram
+from backend.core.startup import lazy_import
+from backend.core.tracing import span
+from backend.services.admission import llm_rate_limiter
+from backend.services.llm_cache import LLMCache, llm_cache
+from backend.services.llm_resilience import LLMError, LatencyTracker, backoff_delay, describe, is_retryable, is_timeout
+from backend.services.prompt_builder import estimate_tokens
 
 load_dotenv()
 logger = logging.getLogger("llm_client")
 
+# Stub mode streams its sample in pieces of this many characters
+STUB_STREAM_PIECE = 40
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total", "LLM requests by outcome: ok, error, timeout, cache_hit or stub", ("model", "outcome")
+)
+LLM_SECONDS = Histogram("llm_request_seconds", "Latency of LLM calls, all attempts included", ("model", "outcome"))
+LLM_ATTEMPTS = Counter(
+    "llm_attempts_total", "Provider attempts by kind (first, retry, hedge, fallback) and outcome", ("model", "kind", "outcome")
+)
+LLM_ATTEMPT_SECONDS = Histogram("llm_attempt_seconds", "Latency of single provider attempts", ("model", "outcome"))
+LLM_PROMPT_TOKENS = Counter("llm_prompt_tokens_total", "Prompt tokens sent to the provider", ("model",))
+LLM_OUTPUT_TOKENS = Counter("llm_output_tokens_total", "Output tokens received from the provider", ("model",))
+LLM_IN_FLIGHT = Gauge("llm_requests_in_flight", "LLM calls waiting on the provider")
+
 class LLMClient:
     """
     Wrapper using LangChain Google Generative AI (Gemini).
     Falls back to stub JSON if no GOOGLE_API_KEY is found.
+
+    One instance is created per process in the app lifespan and shared by all
+    requests (see get_llm_client), so the underlying HTTP connections are reused.
+
+    Each call makes up to LLM_MAX_ATTEMPTS attempts on the requested model, then on
+    each of LLM_FALLBACK_MODELS, all within LLM_TIMEOUT_SECONDS. With LLM_HEDGE_ENABLED,
+    an attempt slower than the model's recent p95 gets a duplicate request and the
+    first answer wins. When every attempt fails, LLMError is raised.
     """
 
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
         self.model = os.getenv("LLM_MODEL", "gemini-2.5-flash")
+        self.temperature = float(os.getenv("LLM_TEMPERATURE", "0.2"))
+        self.timeout = settings.LLM_TIMEOUT_SECONDS
+        self.attempt_timeout = min(settings.LLM_ATTEMPT_TIMEOUT_SECONDS, self.timeout)
+        self.max_attempts = max(1, settings.LLM_MAX_ATTEMPTS)
+        self.fallback_models = [m.strip() for m in settings.LLM_FALLBACK_MODELS.split(",") if m.strip()]
+        self.base_url = settings.LLM_BASE_URL or None
+        self.latency = LatencyTracker()
+        # One client per model tier, created on first use
+        self._clients = {}
 
         if self.api_key:
             try:
-                self.client = ChatGoogleGenerativeAI(
-                    model=self.model,
-                    google_api_key=self.api_key,
-                    temperature=0.2,
-                )
+                self.client = self._client_for(self.model)
                 self.enabled = True
-                logger.info("Configured ChatGoogleGenerativeAI client")
+                logger.info(
+                    f"Configured ChatGoogleGenerativeAI client{f' at {self.base_url}' if self.base_url else ''}"
+                    f"{f', falling back to {self.fallback_models}' if self.fallback_models else ''}"
+                )
             except Exception as e:
                 logger.error(f"Failed to initialize ChatGoogleGenerativeAI: {e}")
                 self.enabled = False
         else:
             self.enabled = False
 
-    def complete(self, prompt: str) -> str:
+    def _client_for(self, model: str):
+        if model not in self._clients:
+            # LangChain takes seconds to import; only processes that call the LLM load it
+            ChatGoogleGenerativeAI = lazy_import("langchain_google_genai").ChatGoogleGenerativeAI
+            self._clients[model] = ChatGoogleGenerativeAI(
+                model=model,
+                google_api_key=self.api_key,
+                temperature=self.temperature,
+                timeout=self.attempt_timeout,
+                base_url=self.base_url,
+                # Retries are ours (see _call); 1 means a single attempt to the Google SDK
+                max_retries=1,
+            )
+        return self._clients[model]
+
+    def _models(self, model: str) -> list[str]:
+        """The requested model followed by the fallback models, without repeats."""
+        return list(dict.fromkeys([model, *self.fallback_models]))
+
+    def _cache_key(self, prompt: str, model: str) -> str:
+        return LLMCache.key(prompt, model, self.temperature)
+
+    def _cache_put(self, prompt: str, requested: str, answered: str, text: str):
         """
-        Returns LLM text response.
-        If API key missing or failure occurs → returns stub JSON.
+        Caches a response under the model that answered it and, when that was a
+        fallback, under the requested model too, where the next lookup lands.
         """
-        if self.enabled:
-            try:
-                response = self.client.invoke(prompt)
-                return response.content if hasattr(response, "content") else str(response)
+        for name in dict.fromkeys((answered, requested)):
+            llm_cache.put(self._cache_key(prompt, name), text, answered)
+
+    @staticmethod
+    def _text(response) -> str:
+        return response.content if hasattr(response, "content") else str(response)
+
+    @staticmethod
+    def _budget(prompt: str) -> int:
+        """Tokens one call is charged against LLM_TPM_LIMIT."""
+        return estimate_tokens(prompt) + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
+    @staticmethod
+    def _kind(model_index: int, attempt: int) -> str:
+        if attempt:
+            return "retry"
+        return "fallback" if model_index else "first"
+
+    @staticmethod
+    def _record(model: str, outcome: str, started: float, prompt: str = "", text: str = "", usage=None):
+        """Records one LLM call; token counts come from the provider or are estimated."""
+        LLM_REQUESTS.inc(model=model, outcome=outcome)
+        LLM_SECONDS.observe(time.perf_counter() - started, model=model, outcome=outcome)
+        if outcome == "ok":
+            usage = usage or {}
+            LLM_PROMPT_TOKENS.inc(usage.get("input_tokens") or estimate_tokens(prompt), model=model)
+            LLM_OUTPUT_TOKENS.inc(usage.get("output_tokens") or estimate_tokens(text), model=model)
+
+    def _record_attempt(self, model: str, kind: str, outcome: str, started: float):
+        seconds = time.perf_counter() - started
+        LLM_ATTEMPTS.inc(model=model, kind=kind, outcome=outcome)
+        LLM_ATTEMPT_SECONDS.observe(seconds, model=model, outcome=outcome)
+        if outcome == "ok":
+            self.latency.observe(model, seconds)
+
+    def _failed(self, model: str, failures: list, started: float) -> LLMError:
+        """Records a call whose attempts all failed and returns the error to raise."""
+        last = failures[-1] if failures else asyncio.TimeoutError()
+        timed_out = is_timeout(last)
+        self._record(model, "timeout" if timed_out else "error", started)
+        detail = (
+            f"LLM request failed after {len(failures)} attempt(s): {describe(last)}"
+            if failures else f"LLM request did not finish within {self.timeout}s"
+        )
+        logger.error(detail)
+        return LLMError(detail, timed_out=timed_out)
+
+    @staticmethod
+    def _attempt_failed(model: str, kind: str, error: Exception):
+        logger.warning(
+            f"LLM attempt on {model} ({kind}) failed: {describe(error)}",
+            extra={"model": model, "kind": kind, "retryable": is_retryable(error)},
+        )
+
+    def _hedge_delay(self, model: str) -> float | None:
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        if settings.LLM_HEDGE_DELAY_SECONDS > 0:
+            return settings.LLM_HEDGE_DELAY_SECONDS
+        return self.latency.quantile(model, 0.95, settings.LLM_HEDGE_MIN_SAMPLES)
+
+    def complete(self, prompt: str, model: str | None = None) -> str:
+        """
+        Returns LLM text response, from `model` if given or LLM_MODEL otherwise.
+        If API key missing → returns stub JSON; if every attempt fails → raises LLMError.
+        Identical prompts for the same model and temperature are served from the response cache.
+        Blocking, so there is no hedging; each attempt is bounded by the client's timeout.
+        """
+        if not self.enabled:
+            LLM_REQUESTS.inc(model=self.model, outcome="stub")
+            return self._stub_response()
+
+        model = model or self.model
+        if settings.LLM_CACHE_ENABLED:
+            cached = llm_cache.get(self._cache_key(prompt, model))
+            if cached is not None:
+                logger.info("LLM response served from cache")
+                LLM_REQUESTS.inc(model=model, outcome="cache_hit")
+                return cached
+
+        deadline = time.monotonic() + self.timeout
+        started = time.perf_counter()
+        failures = []
+        with span("llm.call", model=model):
+            for index, name in enumerate(self._models(model)):
+                for attempt in range(self.max_attempts):
+                    if attempt:
+                        time.sleep(min(backoff_delay(attempt), max(0.0, deadline - time.monotonic())))
+                    if time.monotonic() >= deadline:
+                        raise self._failed(model, failures, started)
+
+                    kind = self._kind(index, attempt)
+                    # Raises Overloaded past LLM_RATE_MAX_WAIT_SECONDS; not an LLM error, so not retried
+                    llm_rate_limiter.acquire_sync(name, self._budget(prompt))
+                    attempt_started = time.perf_counter()
+                    try:
+                        with span("llm.attempt", model=name, kind=kind), LLM_IN_FLIGHT.track_inprogress():
+                            response = self._client_for(name).invoke(prompt)
+                    except Exception as e:
+                        self._record_attempt(name, kind, "timeout" if is_timeout(e) else "error", attempt_started)
+                        self._attempt_failed(name, kind, e)
+                        failures.append(e)
+                        if not is_retryable(e):
+                            break
+                        continue
+
+                    self._record_attempt(name, kind, "ok", attempt_started)
+                    text = self._text(response)
+                    self._record(name, "ok", started, prompt, text, getattr(response, "usage_metadata", None))
+                    if settings.LLM_CACHE_ENABLED:
+                        self._cache_put(prompt, model, name, text)
+                    return text
+
+        raise self._failed(model, failures, started)
+
+    async def _attempt(self, model: str, prompt: str, kind: str, timeout: float):
+        """One provider call, recorded in llm_attempts_total and as an llm.attempt span."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("llm.attempt", model=model, kind=kind), LLM_IN_FLIGHT.track_inprogress():
+                response = await asyncio.wait_for(self._client_for(model).ainvoke(prompt), timeout=timeout)
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            # The other request of a hedged pair answered first
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "timeout" if is_timeout(e) else "error"
+            self._attempt_failed(model, kind, e)
+            raise
+        finally:
+            self._record_attempt(model, kind, outcome, started)
 
+    async def _hedged_attempt(self, model: str, prompt: str, kind: str, timeout: float):
+        """
+        Runs an attempt; if it has not answered after the hedge delay, sends a duplicate
+        and returns whichever succeeds first. A hedge is only sent when the rate limiter
+        has budget for it right away, and both requests share the attempt's deadline.
+        """
+        delay = self._hedge_delay(model)
+        if delay is None or delay >= timeout:
+            return await self._attempt(model, prompt, kind, timeout)
+
+        primary = asyncio.create_task(self._attempt(model, prompt, kind, timeout))
+        hedge = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not llm_rate_limiter.try_reserve(model, self._budget(prompt)):
+                return await primary
+
+            hedge = asyncio.create_task(self._attempt(model, prompt, "hedge", timeout - delay))
+            pending, error = {primary, hedge}, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def acomplete(self, prompt: str, model: str | None = None) -> str:
+        """
+        Async version of complete(), with hedging. Each attempt is cancelled after
+        LLM_ATTEMPT_TIMEOUT_SECONDS, so the event loop is never blocked.
+        """
+        if not self.enabled:
+            LLM_REQUESTS.inc(model=self.model, outcome="stub")
+            return self._stub_response()
+
+        model = model or self.model
+        if settings.LLM_CACHE_ENABLED:
+            cached = await asyncio.to_thread(llm_cache.get, self._cache_key(prompt, model))
+            if cached is not None:
+                logger.info("LLM response served from cache")
+                LLM_REQUESTS.inc(model=model, outcome="cache_hit")
+                return cached
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        started = time.perf_counter()
+        failures = []
+        with span("llm.call", model=model):
+            for index, name in enumerate(self._models(model)):
+                for attempt in range(self.max_attempts):
+                    if attempt:
+                        await asyncio.sleep(min(backoff_delay(attempt), max(0.0, deadline - loop.time())))
+                    # Raises Overloaded past LLM_RATE_MAX_WAIT_SECONDS; not an LLM error, so not retried
+                    await llm_rate_limiter.acquire(name, self._budget(prompt))
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise self._failed(model, failures, started)
+
+                    kind = self._kind(index, attempt)
+                    try:
+                        response = await self._hedged_attempt(name, prompt, kind, min(self.attempt_timeout, remaining))
+                    except Exception as e:
+                        failures.append(e)
+                        if not is_retryable(e):
+                            break
+                        continue
+
+                    text = self._text(response)
+                    self._record(name, "ok", started, prompt, text, getattr(response, "usage_metadata", None))
+                    if settings.LLM_CACHE_ENABLED:
+                        await asyncio.to_thread(self._cache_put, prompt, model, name, text)
+                    return text
+
+        raise self._failed(model, failures, started)
+
+    async def _open_stream(self, model: str, prompt: str, deadline: float, failures: list):
+        """
+        Starts streaming with the same retries and fallbacks as acomplete(), which are
+        only possible until the first piece arrives. Returns the model, attempt kind,
+        attempt start, stream and first chunk (None for an empty response), or None
+        when every attempt failed. On success the attempt is still counted in flight.
+        """
+        loop = asyncio.get_running_loop()
+        for index, name in enumerate(self._models(model)):
+            for attempt in range(self.max_attempts):
+                if attempt:
+                    await asyncio.sleep(min(backoff_delay(attempt), max(0.0, deadline - loop.time())))
+                await llm_rate_limiter.acquire(name, self._budget(prompt))
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+
+                kind = self._kind(index, attempt)
+                started = time.perf_counter()
+                stream = self._client_for(name).astream(prompt).__aiter__()
+                LLM_IN_FLIGHT.inc()
+                try:
+                    first = await asyncio.wait_for(stream.__anext__(), timeout=min(self.attempt_timeout, remaining))
+                except StopAsyncIteration:
+                    first = None
+                except BaseException as e:
+                    LLM_IN_FLIGHT.dec()
+                    await stream.aclose()
+                    if not isinstance(e, Exception):
+                        self._record_attempt(name, kind, "cancelled", started)
+                        raise
+                    self._record_attempt(name, kind, "timeout" if is_timeout(e) else "error", started)
+                    self._attempt_failed(name, kind, e)
+                    failures.append(e)
+                    if not is_retryable(e):
+                        break
+                    continue
+                return name, kind, started, stream, first
+        return None
+
+    async def astream(self, prompt: str, model: str | None = None):
+        """
+        Yields the response text piece by piece as the provider generates it.
+        Cached responses are yielded whole; a finished stream is cached like complete().
+        Failed attempts are retried or fall back to another model only until the first
+        piece has been yielded; after that a failure raises LLMError, as does running
+        past LLM_TIMEOUT_SECONDS.
+        """
+        if not self.enabled:
+            LLM_REQUESTS.inc(model=self.model, outcome="stub")
+            stub = self._stub_response()
+            for i in range(0, len(stub), STUB_STREAM_PIECE):
+                yield stub[i:i + STUB_STREAM_PIECE]
+            return
+
+        model = model or self.model
+        if settings.LLM_CACHE_ENABLED:
+            cached = await asyncio.to_thread(llm_cache.get, self._cache_key(prompt, model))
+            if cached is not None:
+                logger.info("LLM response served from cache")
+                LLM_REQUESTS.inc(model=model, outcome="cache_hit")
+                yield cached
+                return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        started = time.perf_counter()
+        failures = []
+        pieces, usage = [], None
+        with span("llm.call", model=model, stream=True):
+            opened = await self._open_stream(model, prompt, deadline, failures)
+            if opened is None:
+                raise self._failed(model, failures, started)
+
+            name, kind, attempt_started, stream, chunk = opened
+            outcome = "cancelled"
+            try:
+                while chunk is not None:
+                    usage = getattr(chunk, "usage_metadata", None) or usage
+                    text = self._text(chunk)
+                    if text:
+                        pieces.append(text)
+                        yield text
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        chunk = None
+                outcome = "ok"
             except Exception as e:
-                logger.error(f"Error calling Gemini model: {e}")
-                return "Error: Could not generate response."
+                outcome = "timeout" if is_timeout(e) else "error"
+                self._attempt_failed(name, kind, e)
+                raise self._failed(name, [*failures, e], started) from e
+            finally:
+                LLM_IN_FLIGHT.dec()
+                self._record_attempt(name, kind, outcome, attempt_started)
+                await stream.aclose()
 
+        self._record(name, "ok", started, prompt, "".join(pieces), usage)
+
+        if settings.LLM_CACHE_ENABLED:
+            await asyncio.to_thread(self._cache_put, prompt, model, name, "".join(pieces))
+
+    def _stub_response(self) -> str:
         # ---------- Stub Mode ----------
         logger.info("LLMClient running in stub mode. Returning sample JSON.")
 
@@ -74,3 +446,7 @@ class LLMClient:
 
         return json.dumps(sample)
 
+
+def get_llm_client(request: Request) -> LLMClient:
+    """FastAPI dependency returning the process-wide client created in the app lifespan."""
+    return request.app.state.llm_client
@@ -0,0 +1,80 @@
+"""
+Building blocks for LLMClient's retries, hedging and fallback models: which errors
+are worth another attempt, how long to back off, and the recent latencies the
+hedging delay is derived from.
+"""
+import asyncio
+import math
+import random
+import threading
+from collections import deque
+
+import httpx
+
+from backend.core.config import settings
+
+# Request timeout, rate limited, and server-side failures
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# Successful latencies remembered per model
+LATENCY_WINDOW = 200
+
+
+class LLMError(Exception):
+    """Every attempt at an LLM call failed; 504 if the last one timed out, else 502."""
+
+    def __init__(self, detail: str, timed_out: bool = False):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = 504 if timed_out else 502
+
+
+def status_code(error: BaseException) -> int | None:
+    """HTTP status of a provider error; LangChain keeps the SDK's error as the cause."""
+    while error is not None:
+        code = getattr(error, "code", None)
+        if isinstance(code, int):
+            return code
+        error = error.__cause__
+    return None
+
+
+def describe(error: BaseException) -> str:
+    message = str(error)
+    return f"{type(error).__name__}: {message}" if message else type(error).__name__
+
+
+def is_timeout(error: BaseException) -> bool:
+    return isinstance(error, (asyncio.TimeoutError, httpx.TimeoutException)) or status_code(error) in (408, 504)
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    return status_code(error) in RETRYABLE_STATUS
+
+
+def backoff_delay(retry: int) -> float:
+    """Seconds to sleep before the `retry`-th retry (1-based), with full jitter."""
+    ceiling = min(settings.LLM_BACKOFF_MAX_SECONDS, settings.LLM_BACKOFF_BASE_SECONDS * 2 ** (retry - 1))
+    return random.uniform(0, ceiling)
+
+
+class LatencyTracker:
+    """Latencies of the last LATENCY_WINDOW successful attempts per model. Thread-safe."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, model: str, q: float, min_samples: int = 1) -> float | None:
+        """Nearest-rank quantile, or None until `min_samples` latencies were seen."""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[max(1, math.ceil(q * len(samples))) - 1]
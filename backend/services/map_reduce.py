@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import re
+from backend.core.config import settings
+from backend.services.llm_resilience import LLMError
+from backend.services.prompt_builder import build_prompt, build_reduce_prompt, estimate_tokens
+from backend.utils.validators import normalize_analysis, parse_llm_json
+
+logger = logging.getLogger("map_reduce")
+
+SENTIMENT_SCORES = {"positive": 1, "neutral": 0, "negative": -1}
+
+
+# ---------------- SPLIT ----------------
+
+def split_transcript(transcript: str, max_tokens: int) -> list[str]:
+    """
+    Splits a transcript into chunks of at most ~max_tokens on line boundaries.
+    Each Whisper segment ("[start - end] text") and each speaker turn is one line,
+    so chunks never cut a segment or turn in half and keep their timestamps.
+    """
+    chunks, current, current_tokens = [], [], 0
+
+    for line in transcript.splitlines():
+        if not line.strip():
+            continue
+        for piece in _split_long_line(line, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                chunks.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _split_long_line(line: str, max_tokens: int) -> list[str]:
+    """A single line longer than the budget (e.g. an unsegmented paste) is split on sentences."""
+    if estimate_tokens(line) <= max_tokens:
+        return [line]
+    pieces, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", line):
+        if current and estimate_tokens(current + " " + sentence) > max_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+# ---------------- MAP ----------------
+
+async def analyze_chunks(req, llm, chunks: list[str], include_sentiment: bool, include_timeline: bool) -> list[dict]:
+    """
+    Analyzes every chunk concurrently, at most LLM_MAX_PARALLEL_CHUNKS at a time.
+    Each partial is repaired like single-mode output, so the merge steps can rely on its shape.
+    """
+    semaphore = asyncio.Semaphore(settings.LLM_MAX_PARALLEL_CHUNKS)
+
+    async def analyze(index: int, chunk: str) -> dict:
+        prompt = build_prompt(
+            transcript=chunk,
+            meeting_title=req.meeting_title,
+            meeting_date=req.meeting_date,
+            include_speakers=req.include_speakers,
+            include_sentiment=include_sentiment,
+            include_timeline=include_timeline,
+            language=req.language,
+            part=(index + 1, len(chunks)),
+        )
+        async with semaphore:
+            output_text = await llm.acomplete(prompt)
+        return normalize_analysis(parse_llm_json(output_text))
+
+    return await asyncio.gather(*(analyze(i, chunk) for i, chunk in enumerate(chunks)))
+
+
+# ---------------- REDUCE ----------------
+
+def _normalize_task(task: str) -> str:
+    return re.sub(r"[^a-z0-9 ]", "", re.sub(r"\s+", " ", task.lower())).strip()
+
+
+def merge_action_items(partials: list[dict]) -> list[dict]:
+    """Deduplicates tasks across chunks, keeping the owner and earliest deadline found."""
+    merged: dict[str, dict] = {}
+    for partial in partials:
+        for item in partial.get("action_items") or []:
+            task = (item.get("task") or "").strip()
+            if not task:
+                continue
+            key = _normalize_task(task)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {
+                    "task": task,
+                    "assigned_to": item.get("assigned_to"),
+                    "deadline": item.get("deadline"),
+                }
+                continue
+            existing["assigned_to"] = existing["assigned_to"] or item.get("assigned_to")
+            deadlines = [d for d in (existing["deadline"], item.get("deadline")) if d]
+            existing["deadline"] = min(deadlines) if deadlines else None
+    return list(merged.values())
+
+
+def merge_timelines(partials: list[dict]) -> list[dict]:
+    seen, timeline = set(), []
+    for partial in partials:
+        for entry in partial.get("timeline") or []:
+            key = (str(entry.get("timestamp")), str(entry.get("topic")).strip().lower())
+            if key not in seen:
+                seen.add(key)
+                timeline.append(entry)
+    return timeline
+
+
+def merge_sentiment(partials: list[dict]) -> dict:
+    """Averages each speaker's sentiment over the chunks they spoke in."""
+    scores: dict[str, list[int]] = {}
+    for partial in partials:
+        for speaker, sentiment in (partial.get("speaker_sentiment") or {}).items():
+            score = SENTIMENT_SCORES.get(str(sentiment).lower())
+            if score is not None:
+                scores.setdefault(speaker, []).append(score)
+
+    merged = {}
+    for speaker, values in scores.items():
+        average = sum(values) / len(values)
+        merged[speaker] = "positive" if average > 0.33 else "negative" if average < -0.33 else "neutral"
+    return merged
+
+
+async def reduce_summaries(req, llm, partials: list[dict]) -> dict:
+    """Merges per-chunk summaries with one more LLM call, or by concatenation if that fails."""
+    summaries = [
+        {
+            "part": i + 1,
+            "summary_short": p.get("summary_short") or [],
+            "summary_detailed": p.get("summary_detailed") or "",
+            "discussion_flow": p.get("discussion_flow") or [],
+        }
+        for i, p in enumerate(partials)
+    ]
+    prompt = build_reduce_prompt(summaries, req.meeting_title, req.meeting_date, req.language)
+    try:
+        merged = parse_llm_json(await llm.acomplete(prompt))
+        return {
+            "summary_short": merged["summary_short"],
+            "summary_detailed": merged["summary_detailed"],
+            "discussion_flow": merged["discussion_flow"],
+        }
+    except (LLMError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Summary reduce step failed, concatenating part summaries instead: {e}")
+        return {
+            "summary_short": [point for s in summaries for point in s["summary_short"]],
+            "summary_detailed": "\n\n".join(s["summary_detailed"] for s in summaries if s["summary_detailed"]),
+            "discussion_flow": [point for s in summaries for point in s["discussion_flow"]],
+        }
+
+
+async def analyze_long_transcript(
+    req, llm, transcript: str, include_sentiment: bool, include_timeline: bool
+) -> dict:
+    """
+    Map-reduce analysis: token-budgeted chunks of `transcript` are analyzed concurrently
+    and the partial results merged into one ProcessResponse-shaped dict.
+    Raises ValueError if a chunk's output cannot be parsed.
+    """
+    chunks = split_transcript(transcript, settings.LLM_CHUNK_TOKENS)
+    logger.info(f"Analyzing transcript in {len(chunks)} chunks")
+
+    partials = await analyze_chunks(req, llm, chunks, include_sentiment, include_timeline)
+    summaries = await reduce_summaries(req, llm, partials)
+
+    return {
+        **summaries,
+        "timeline": merge_timelines(partials) if include_timeline else [],
+        "action_items": merge_action_items(partials),
+        "speaker_sentiment": merge_sentiment(partials) if include_sentiment else {},
+    }
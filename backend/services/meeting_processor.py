@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import re
+from pydantic import ValidationError
+from backend.core.config import settings
+from backend.core.metrics import Histogram
+from backend.schemas import ProcessResponse
+from backend.services import analysis_store, meeting_store, search_index
+from backend.services.admission import Overloaded, llm_lane
+from backend.services.llm_resilience import LLMError
+from backend.services.map_reduce import analyze_long_transcript
+from backend.services.prompt_builder import build_prompt, compact_transcript, estimate_tokens
+from backend.services.section_analysis import analyze_sections
+from backend.utils.json_stream import IncrementalJSONParser
+from backend.utils.validators import normalize_analysis, parse_llm_json
+
+logger = logging.getLogger("meeting_processor")
+
+# Detect timestamps like 00:12 or 1:05:33, or Whisper's [12.34 - 15.67]
+TIMESTAMP_RE = re.compile(r"\[\s*\d+(\.\d+)?\s*-\s*\d+(\.\d+)?\s*\]|\b\d{1,2}:\d{2}(:\d{2})?\b")
+
+PROCESS_SECONDS = Histogram("process_request_seconds", "Time to process one /process request", ("mode",))
+
+
+class ProcessingError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def use_chunked_mode(req, prompt_tokens: int) -> bool:
+    if req.mode == "chunked":
+        return True
+    if req.mode == "single":
+        return False
+    return prompt_tokens > settings.LLM_PROMPT_TOKEN_BUDGET
+
+
+def pick_model(prompt_tokens: int) -> str | None:
+    """Large prompts go to LLM_LARGE_PROMPT_MODEL when one is configured."""
+    if settings.LLM_LARGE_PROMPT_MODEL and prompt_tokens > settings.LLM_LARGE_PROMPT_TOKENS:
+        return settings.LLM_LARGE_PROMPT_MODEL
+    return None
+
+
+# Full analyses being generated right now, so concurrent requests share one LLM run
+_inflight: dict[str, asyncio.Task] = {}
+
+
+async def process_request(req, llm) -> ProcessResponse:
+    """
+    Runs one ProcessRequest through prompt building, the LLM and JSON parsing.
+    Prompts over LLM_PROMPT_TOKEN_BUDGET go through map-reduce (see map_reduce.py).
+    With `full_analysis`, every section is generated once per transcript and the
+    include_* flags only filter the stored result.
+    The output is validated into ProcessResponse exactly once, here.
+    Raises ProcessingError with the HTTP status to report.
+    """
+    if not req.transcript or len(req.transcript.strip()) < 10:
+        raise ProcessingError(400, "Transcript is too short or empty.")
+
+    has_timestamps = bool(TIMESTAMP_RE.search(req.transcript))
+
+    # Only allow timeline if user asked AND transcript has timestamps
+    include_timeline_effective = req.include_timeline and has_timestamps
+
+    with PROCESS_SECONDS.time(mode="full" if req.full_analysis else req.mode):
+        if req.full_analysis:
+            parsed = await full_analysis(req, llm, include_timeline=has_timestamps)
+        else:
+            parsed = await analyze(req, llm, req.include_sentiment, include_timeline_effective)
+
+        try:
+            result = ProcessResponse.model_validate(project(parsed, req, include_timeline_effective))
+        except ValidationError as e:
+            raise ProcessingError(500, f"Invalid model output: {e}")
+
+        result.meeting_id = await store_meeting(req, parsed)
+    return result
+
+
+async def store_meeting(req, parsed: dict) -> int | None:
+    """
+    Persists the analysis of a meeting, before the include_* flags filter it, and
+    indexes it for search when it changed; failures are logged, not returned to the user.
+    """
+    try:
+        data = ProcessResponse.model_validate(
+            {**parsed, "meeting_title": req.meeting_title, "meeting_date": req.meeting_date}
+        ).model_dump()
+        meeting_id, written = await asyncio.to_thread(
+            meeting_store.save_meeting, analysis_store.transcript_sha256(req.transcript), data
+        )
+    except Exception as e:
+        logger.error(f"Failed to store meeting: {e}")
+        return None
+    if not written:
+        return meeting_id
+
+    try:
+        await asyncio.to_thread(search_index.index_meeting, meeting_id, data)
+    except Exception as e:
+        logger.error(f"Failed to index meeting {meeting_id} for search: {e}")
+    return meeting_id
+
+
+async def full_analysis(req, llm, include_timeline: bool) -> dict:
+    """Returns the stored all-sections analysis of this transcript, generating it on first use."""
+    key = analysis_store.analysis_key(req)
+    cached = await asyncio.to_thread(analysis_store.get, key)
+    if cached is not None:
+        logger.info("Full analysis served from store")
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        async def generate():
+            try:
+                parsed = await analyze(req, llm, True, include_timeline)
+                # Sectioned runs with failed sections are retried next time rather than stored
+                if not parsed.get("errors"):
+                    await asyncio.to_thread(analysis_store.put, key, parsed)
+                return parsed
+            finally:
+                _inflight.pop(key, None)
+
+        task = _inflight[key] = asyncio.create_task(generate())
+
+    # shield: one caller disconnecting must not cancel the run the others wait on
+    return dict(await asyncio.shield(task))
+
+
+def prepare_prompt(req, include_sentiment: bool, include_timeline: bool) -> tuple[str, str, int]:
+    """Returns the (compacted) transcript, the single-call prompt and its estimated tokens."""
+    transcript = req.transcript
+    if settings.PROMPT_COMPACTION:
+        transcript = compact_transcript(transcript, keep_timestamps=include_timeline)
+
+    prompt = build_prompt(
+        transcript=transcript,
+        meeting_title=req.meeting_title,
+        meeting_date=req.meeting_date,
+        include_speakers=req.include_speakers,
+        include_sentiment=include_sentiment,
+        include_timeline=include_timeline,
+        language=req.language
+    )
+    prompt_tokens = estimate_tokens(prompt)
+    logger.info(
+        f"Prompt ~{prompt_tokens} tokens (transcript ~{estimate_tokens(req.transcript)} tokens, "
+        f"~{estimate_tokens(transcript)} after compaction)"
+    )
+    return transcript, prompt, prompt_tokens
+
+
+async def analyze_chunked(req, llm, transcript: str, include_sentiment: bool, include_timeline: bool) -> dict:
+    """Map-reduce analysis; failures other than the expected LLM, capacity and parse errors become a 500."""
+    try:
+        return await analyze_long_transcript(req, llm, transcript, include_sentiment, include_timeline)
+    except (LLMError, Overloaded, ValueError):
+        raise
+    except Exception as e:
+        logger.exception("Chunked analysis failed")
+        raise ProcessingError(500, f"Chunked analysis failed: {e}")
+
+
+async def analyze(req, llm, include_sentiment: bool, include_timeline: bool) -> dict:
+    """Builds the prompt for the requested sections, calls the LLM and parses its JSON."""
+    transcript, prompt, prompt_tokens = prepare_prompt(req, include_sentiment, include_timeline)
+
+    try:
+        if req.mode == "sectioned":
+            parsed = await analyze_sections(req, llm, transcript, include_sentiment, include_timeline)
+        elif use_chunked_mode(req, prompt_tokens):
+            parsed = await analyze_chunked(req, llm, transcript, include_sentiment, include_timeline)
+        else:
+            parsed = parse_llm_json(await llm.acomplete(prompt, model=pick_model(prompt_tokens)))
+    except LLMError as e:
+        raise ProcessingError(e.status_code, e.detail)
+    except ValueError as e:
+        raise ProcessingError(500, str(e))
+
+    return normalize_analysis(parsed)
+
+
+def project(parsed: dict, req, include_timeline_effective: bool) -> dict:
+    """Applies the request's include_* flags and meeting metadata to an analysis."""
+    parsed = dict(parsed)
+
+    # Enforce empty timeline when we disabled it
+    if not include_timeline_effective:
+        parsed["timeline"] = []
+
+    # Enforce empty sentiment when we disabled it
+    if not req.include_sentiment:
+        parsed["speaker_sentiment"] = {}
+
+    # Failures of sections that were filtered out don't concern this request
+    errors = dict(parsed.get("errors") or {})
+    if not include_timeline_effective:
+        errors.pop("timeline", None)
+    if not req.include_sentiment:
+        errors.pop("sentiment", None)
+    parsed["errors"] = errors
+
+    parsed["meeting_title"] = req.meeting_title
+    parsed["meeting_date"] = req.meeting_date
+
+    return parsed
+
+
+def stream_process(req, llm):
+    """
+    Streaming variant of process_request for POST /process/stream. Validation errors
+    are raised here as ProcessingError; the returned async iterator then yields:
+      {"type": "item", "field": ..., "index": ..., "value": ...}  one array entry
+      {"type": "field", "field": ..., "value": ...}               one complete field
+      {"type": "result", "result": {...}}                         the final ProcessResponse
+      {"type": "error", "error": ...}
+    Fields are emitted as soon as the model has finished generating them. With
+    `full_analysis`, a stored analysis is replayed as field events without calling the LLM.
+    Only single-prompt analyses can stream: "sectioned", "chunked" and "auto" above
+    LLM_PROMPT_TOKEN_BUDGET run through process_request, and their fields are sent
+    once the whole result is ready.
+    """
+    if not req.transcript or len(req.transcript.strip()) < 10:
+        raise ProcessingError(400, "Transcript is too short or empty.")
+
+    has_timestamps = bool(TIMESTAMP_RE.search(req.transcript))
+    include_timeline_effective = req.include_timeline and has_timestamps
+    if req.full_analysis:
+        # Generate every section so the stored analysis can serve any later option toggle
+        _, prompt, prompt_tokens = prepare_prompt(req, True, has_timestamps)
+    else:
+        _, prompt, prompt_tokens = prepare_prompt(req, req.include_sentiment, include_timeline_effective)
+    streamable = req.mode != "sectioned" and not use_chunked_mode(req, prompt_tokens)
+    excluded = set()
+    if not include_timeline_effective:
+        excluded.add("timeline")
+    if not req.include_sentiment:
+        excluded.add("speaker_sentiment")
+
+    async def events():
+        parser = IncrementalJSONParser()
+        pieces = []
+        try:
+            if not streamable:
+                logger.info(f"Mode '{req.mode}' cannot stream; sending the fields once the analysis is done")
+                result = (await process_request(req, llm)).model_dump()
+                for field, value in result.items():
+                    yield {"type": "field", "field": field, "value": value}
+                yield {"type": "result", "result": result}
+                return
+
+            key = analysis_store.analysis_key(req) if req.full_analysis else None
+            stored = await asyncio.to_thread(analysis_store.get, key) if key else None
+            if stored is not None:
+                result = ProcessResponse.model_validate(project(stored, req, include_timeline_effective))
+                result.meeting_id = await store_meeting(req, stored)
+                for field, value in result.model_dump().items():
+                    yield {"type": "field", "field": field, "value": value}
+                yield {"type": "result", "result": result.model_dump()}
+                return
+
+            async for text in llm.astream(prompt, model=pick_model(prompt_tokens)):
+                pieces.append(text)
+                for event in parser.feed(text):
+                    if event[1] in excluded:
+                        continue
+                    if event[0] == "item":
+                        yield {"type": "item", "field": event[1], "index": event[2], "value": event[3]}
+                    else:
+                        yield {"type": "field", "field": event[1], "value": event[2]}
+
+            parsed = normalize_analysis(parse_llm_json("".join(pieces)))
+            result = ProcessResponse.model_validate(project(parsed, req, include_timeline_effective))
+            if key:
+                await asyncio.to_thread(analysis_store.put, key, parsed)
+            result.meeting_id = await store_meeting(req, parsed)
+            yield {"type": "result", "result": result.model_dump()}
+        except ValidationError as e:
+            yield {"type": "error", "error": f"Invalid model output: {e}"}
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            yield {"type": "error", "error": str(e) or type(e).__name__}
+
+    return events()
+
+
+async def process_batch(requests, llm, concurrency: int):
+    """
+    Processes many requests with at most `concurrency` running at once and yields
+    one result per request in completion order. A failing item yields an error
+    entry instead of aborting the batch.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, req) -> dict:
+        # Batch items share the LLM lane but wait for it: the batch bounds itself
+        async with semaphore, llm_lane.admit(bounded=False):
+            try:
+                result = await process_request(req, llm)
+                return {"index": index, "status": "ok", "result": result.model_dump()}
+            except ProcessingError as e:
+                return {"index": index, "status": "error", "status_code": e.status_code, "error": e.detail}
+            except Overloaded as e:
+                return {
+                    "index": index, "status": "error", "status_code": e.status_code,
+                    "error": e.detail, "retry_after": e.retry_after,
+                }
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {e}")
+                return {"index": index, "status": "error", "status_code": 500, "error": str(e)}
+
+    tasks = [asyncio.create_task(run(i, req)) for i, req in enumerate(requests)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The client may disconnect mid-stream; don't keep calling the LLM for it
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,209 @@
+from typing import Optional
+import orjson
+from sqlalchemy import func
+from backend.core.database import SessionLocal
+from backend.models import Meeting, MeetingActionItem
+from backend.services.section_analysis import SECTION_DEFAULTS
+
+
+def _merge(stored: dict, result: dict) -> Optional[dict]:
+    """
+    Fills the fields the stored analysis has empty (not requested, or failed) from
+    `result`; fields already stored are kept. None if `result` adds nothing.
+    """
+    merged = dict(stored)
+    for field, value in result.items():
+        if field != "errors" and value and not stored.get(field):
+            merged[field] = value
+    if merged == stored:
+        return None
+    # A section's failure only stays recorded while its fields are still empty
+    merged["errors"] = {
+        section: error
+        for section, error in (stored.get("errors") or {}).items()
+        if not any(merged.get(field) for field in SECTION_DEFAULTS.get(section, ()))
+    }
+    return merged
+
+
+def _upsert_action_items(db, meeting: Meeting, items: list[dict]):
+    """Updates the meeting's action items in place, so their ids (and cursors on them) stay valid."""
+    existing = (
+        db.query(MeetingActionItem)
+        .filter(MeetingActionItem.meeting_id == meeting.id)
+        .order_by(MeetingActionItem.id)
+        .all()
+    )
+    for row, item in zip(existing, items):
+        row.task = item["task"]
+        row.assigned_to = item.get("assigned_to")
+        row.deadline = item.get("deadline")
+        row.meeting_date = meeting.meeting_date
+    for row in existing[len(items):]:
+        db.delete(row)
+    db.add_all(
+        MeetingActionItem(
+            meeting_id=meeting.id,
+            task=item["task"],
+            assigned_to=item.get("assigned_to"),
+            deadline=item.get("deadline"),
+            meeting_date=meeting.meeting_date,
+        )
+        for item in items[len(existing):]
+    )
+
+
+def save_meeting(transcript_sha256: str, result: dict) -> tuple[int, bool]:
+    """
+    Stores a processed meeting and its action items. `result` should be the full
+    analysis, before the request's include_* flags were applied.
+    The same transcript processed again for the same meeting date updates the
+    stored meeting instead of adding a duplicate, and only fills in sections it
+    does not have yet, so most repeats write nothing.
+    Returns the meeting id and whether anything was written.
+    """
+    meeting_date = result.get("meeting_date") or None
+    with SessionLocal() as db:
+        meeting = (
+            db.query(Meeting)
+            .filter(Meeting.transcript_sha256 == transcript_sha256, Meeting.meeting_date == meeting_date)
+            .first()
+        )
+        if meeting is None:
+            meeting = Meeting(
+                transcript_sha256=transcript_sha256,
+                meeting_date=meeting_date,
+                meeting_title=result.get("meeting_title"),
+                result=orjson.dumps(result).decode(),
+            )
+            db.add(meeting)
+            db.flush()
+            _upsert_action_items(db, meeting, result.get("action_items") or [])
+            db.commit()
+            return meeting.id, True
+
+        stored = orjson.loads(meeting.result)
+        merged = _merge(stored, result)
+        if merged is None:
+            return meeting.id, False
+        meeting.meeting_title = merged.get("meeting_title")
+        meeting.result = orjson.dumps(merged).decode()
+        if merged.get("action_items") != stored.get("action_items"):
+            _upsert_action_items(db, meeting, merged.get("action_items") or [])
+        db.commit()
+        return meeting.id, True
+
+
+def get_meeting(meeting_id: int) -> Optional[dict]:
+    with SessionLocal() as db:
+        meeting = db.get(Meeting, meeting_id)
+        if meeting is None:
+            return None
+        return {**orjson.loads(meeting.result), "meeting_id": meeting.id}
+
+
+def _cursor_id(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def list_action_items(
+    assignee: Optional[str] = None,
+    due_before: Optional[str] = None,
+    due_after: Optional[str] = None,
+    meeting_date_from: Optional[str] = None,
+    meeting_date_to: Optional[str] = None,
+    meeting_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    """
+    Action items in id order, one page at a time. `cursor` is the next_cursor of the
+    previous page; keyset pagination keeps every page an index range scan however
+    deep it is. Date bounds are inclusive (YYYY-MM-DD); items without a deadline
+    never match a due_* filter. Raises ValueError for a malformed cursor.
+    """
+    after_id = _cursor_id(cursor)
+    with SessionLocal() as db:
+        q = db.query(MeetingActionItem, Meeting.meeting_title).join(
+            Meeting, Meeting.id == MeetingActionItem.meeting_id
+        )
+        if assignee:
+            q = q.filter(MeetingActionItem.assigned_to == assignee)
+        if due_before:
+            q = q.filter(MeetingActionItem.deadline <= due_before)
+        if due_after:
+            q = q.filter(MeetingActionItem.deadline >= due_after)
+        if meeting_date_from:
+            q = q.filter(MeetingActionItem.meeting_date >= meeting_date_from)
+        if meeting_date_to:
+            q = q.filter(MeetingActionItem.meeting_date <= meeting_date_to)
+        if meeting_id is not None:
+            q = q.filter(MeetingActionItem.meeting_id == meeting_id)
+        if after_id is not None:
+            q = q.filter(MeetingActionItem.id > after_id)
+        # One extra row tells whether another page exists
+        rows = q.order_by(MeetingActionItem.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [
+            {
+                "id": item.id,
+                "meeting_id": item.meeting_id,
+                "meeting_title": meeting_title,
+                "meeting_date": item.meeting_date,
+                "task": item.task,
+                "assigned_to": item.assigned_to,
+                "deadline": item.deadline,
+            }
+            for item, meeting_title in rows
+        ],
+        "next_cursor": str(rows[-1][0].id) if has_more else None,
+    }
+
+
+def list_meetings(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> dict:
+    """Stored meetings, newest first, with their action item counts; keyset-paginated like list_action_items."""
+    before_id = _cursor_id(cursor)
+    with SessionLocal() as db:
+        item_count = (
+            db.query(func.count(MeetingActionItem.id))
+            .filter(MeetingActionItem.meeting_id == Meeting.id)
+            .correlate(Meeting)
+            .scalar_subquery()
+        )
+        q = db.query(Meeting, item_count)
+        if date_from:
+            q = q.filter(Meeting.meeting_date >= date_from)
+        if date_to:
+            q = q.filter(Meeting.meeting_date <= date_to)
+        if before_id is not None:
+            q = q.filter(Meeting.id < before_id)
+        rows = q.order_by(Meeting.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [
+            {
+                "id": meeting.id,
+                "meeting_title": meeting.meeting_title,
+                "meeting_date": meeting.meeting_date,
+                "action_items": count,
+                "created_at": meeting.created_at.isoformat() if meeting.created_at else None,
+            }
+            for meeting, count in rows
+        ],
+        "next_cursor": str(rows[-1][0].id) if has_more else None,
+    }
@@ -1,3 +1,221 @@
+import functools
+import json
+import re
+import time
+from backend.core.metrics import Histogram
+from backend.core.tracing import span
+
+# Whisper segment prefix, e.g. "[12.34 - 15.67] "
+SEGMENT_TIMESTAMP_RE = re.compile(r"^\[\s*(\d+(?:\.\d+)?)\s*-\s*\d+(?:\.\d+)?\s*\]\s*")
+SPEAKER_RE = re.compile(r"^([A-Z][\w .'-]{0,40}):(?!\d)\s*")
+FILLER_RE = re.compile(r"(?:,\s*)?\b(?:u+m+|u+h+|e+r+m+|h+m+|mm-hmm|uh-huh)\b[,.]?", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+
+PROMPT_BUILD_SECONDS = Histogram(
+    "prompt_build_seconds", "Time to build a prompt", ("kind",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+PROMPT_TOKENS = Histogram(
+    "prompt_tokens", "Estimated size of built prompts in tokens", ("kind",),
+    buckets=(500, 1000, 2000, 4000, 8000, 12000, 16000, 24000, 32000, 64000, 128000),
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Gemini-style tokenizers (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _coarse_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    return f"[{minutes:02d}:{secs:02d}]"
+
+
+def compact_transcript(transcript: str, keep_timestamps: bool = True) -> str:
+    """
+    Shrinks a transcript before it goes into a prompt:
+    - Whisper "[12.34 - 15.67]" prefixes become "[00:12]", or are dropped when
+      the timeline is not requested
+    - filler words (um, uh, erm, hmm, ...) and repeated whitespace are removed
+    - consecutive lines by the same speaker are merged into one
+    """
+    lines: list[str] = []
+    last_speaker = None
+
+    for raw in transcript.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+
+        prefix = ""
+        match = SEGMENT_TIMESTAMP_RE.match(line)
+        if match:
+            line = line[match.end():]
+            if keep_timestamps:
+                prefix = _coarse_timestamp(float(match.group(1))) + " "
+
+        speaker = None
+        match = SPEAKER_RE.match(line)
+        if match:
+            speaker = match.group(1)
+            line = line[match.end():]
+
+        line = WHITESPACE_RE.sub(" ", FILLER_RE.sub(" ", line)).strip()
+        if not line:
+            continue
+
+        if speaker and speaker == last_speaker and lines:
+            lines[-1] += " " + line
+            continue
+
+        last_speaker = speaker
+        lines.append(f"{prefix}{speaker}: {line}" if speaker else f"{prefix}{line}")
+
+    return "\n".join(lines)
+
+
+# JSON fields of each independently generated section (see build_section_prompt)
+SECTION_FIELDS = {
+    "summary": [
+        '  "summary_short": ["..."],',
+        '  "summary_detailed": "...",',
+        '  "discussion_flow": ["..."]',
+    ],
+    "action_items": [
+        '  "action_items": [{ "task": "...", "assigned_to": "...", "deadline": "YYYY-MM-DD|null" }]',
+    ],
+    "timeline": [
+        '  "timeline": [{ "timestamp": "MM:SS", "topic": "..." }]',
+    ],
+    "sentiment": [
+        '  "speaker_sentiment": { "Speaker Name": "positive|neutral|negative" }',
+    ],
+}
+
+SUMMARY_RULE = "For 'summary_detailed', write a detailed summary in 2–3 separate paragraphs."
+
+ACTION_ITEM_RULES = [
+    "Extract only clear, actionable tasks with an explicit verb (e.g., add, update, deploy, fix).",
+    "Each action item MUST represent exactly one unique task.",
+    "Do NOT split a single commitment into multiple tasks unless they are clearly different.",
+    "Merge overlapping or duplicate tasks into a single action item.",
+    "If ownership is mentioned, populate 'assigned_to'. Otherwise, set it to null.",
+]
+
+TIMELINE_RULE = (
+    "Generate a timeline only if explicit timestamps or clear time cues exist. "
+    "Do NOT invent timestamps. If unreliable, return an empty array."
+)
+
+SENTIMENT_RULE = (
+    "For each speaker who speaks at least once, classify sentiment as positive, neutral, or negative."
+)
+
+NO_EXTRA_TEXT_RULE = "Do not include markdown, explanations, or any text outside the JSON object."
+
+
+def _speaker_rules(include_speakers: bool) -> list[str]:
+    if include_speakers:
+        return ["Preserve and use speaker labels found in the transcript (e.g., 'Alice:', 'Bob:')."]
+    return ["Ignore speaker labels."]
+
+
+def _deadline_rules(meeting_date: str | None) -> list[str]:
+    if not meeting_date:
+        return [
+            "Only extract deadlines if explicitly mentioned. "
+            "Do NOT infer or guess dates without a meeting date. "
+            "If unclear, set deadline to null."
+        ]
+    return [
+        "Compute all deadlines relative to the meeting date.",
+        f"Treat the meeting date as {meeting_date} (YYYY-MM-DD).",
+
+        (
+            "WEEKDAY RESOLUTION (STRICT, NO EXCEPTIONS): "
+            "If a weekday name is mentioned WITHOUT the word 'next' "
+            "(e.g., 'Friday', 'by Friday', 'Friday morning'), "
+            "AND it matches the weekday of the meeting date, "
+            "you MUST use the MEETING DATE itself. "
+            "You are NOT allowed to move it to the next day or next week."
+        ),
+
+        (
+            "If a weekday name is mentioned WITHOUT 'next' "
+            "and it occurs later in the SAME calendar week after the meeting date, "
+            "use that same-week date."
+        ),
+
+        (
+            "If the phrase 'next <weekday>' is explicitly used "
+            "(e.g., 'next Friday'), resolve it to the weekday in the FOLLOWING week."
+        ),
+
+        # Relative phrases
+        "If someone says 'tomorrow', deadline = meeting date + 1 day.",
+        "If someone says 'day after tomorrow', deadline = meeting date + 2 days.",
+
+        # Absolute dates
+        (
+            "If an absolute date is mentioned (e.g., '18/12/2025', 'December 18, 2025'), "
+            "convert it to strict YYYY-MM-DD format."
+        ),
+
+        # Safety rules
+        "Deadlines must NEVER be earlier than the meeting date.",
+        "If resolving a deadline places it before the meeting date, use the meeting date instead.",
+        "If multiple deadlines are mentioned for the same task, choose the earliest explicit one.",
+        "If no explicit or clearly inferable deadline exists, set deadline to null.",
+        "Do NOT guess or invent deadlines.",
+        "Always output deadlines in strict YYYY-MM-DD format."
+    ]
+
+
+def _assemble(
+    instructions: list[str],
+    extra: list[str],
+    transcript: str,
+    meeting_title: str = "",
+    meeting_date: str | None = None,
+) -> str:
+    prompt_parts = [
+        "### INSTRUCTIONS ###",
+        "\n".join(instructions),
+        "\n".join(extra),
+        "### TRANSCRIPT ###",
+        transcript,
+    ]
+
+    if meeting_title:
+        prompt_parts.insert(2, f"Meeting Title: {meeting_title}")
+
+    if meeting_date:
+        insert_pos = 3 if meeting_title else 2
+        prompt_parts.insert(
+            insert_pos, f"Meeting Date: {meeting_date} (YYYY-MM-DD)"
+        )
+
+    return "\n\n".join(prompt_parts)
+
+
+def _instrumented(kind: str):
+    """Records the build time and estimated token count of every prompt built by the function."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            with span("prompt.build", kind=kind) as current:
+                prompt = fn(*args, **kwargs)
+                tokens = estimate_tokens(prompt)
+                current.set_attribute("tokens", tokens)
+            PROMPT_BUILD_SECONDS.observe(time.perf_counter() - started, kind=kind)
+            PROMPT_TOKENS.observe(tokens, kind=kind)
+            return prompt
+        return wrapper
+    return decorator
+
+
+@_instrumented("full")
 def build_prompt(
     transcript: str,
     meeting_title: str = "",
@@ -6,9 +224,11 @@ def build_prompt(
     include_sentiment: bool = True,
     include_timeline: bool = True,
     language: str = "english",
+    part: tuple[int, int] | None = None,
 ) -> str:
     """
     Constructs a single prompt that instructs the LLM to return only the specified JSON format.
+    `part` = (index, count) marks the transcript as one chunk of a longer meeting.
     """
 
     # ---------------- JSON STRUCTURE ----------------
@@ -39,107 +259,108 @@ def build_prompt(
         "{",
     ] + json_fields + [
         "}",
-        "For 'summary_detailed', write a detailed summary in 2–3 separate paragraphs."
+        SUMMARY_RULE,
     ]
 
     extra = []
 
-    # ---------------- SPEAKER HANDLING ----------------
-    if include_speakers:
+    # ---------------- PARTIAL TRANSCRIPT ----------------
+    if part:
         extra.append(
-            "Preserve and use speaker labels found in the transcript (e.g., 'Alice:', 'Bob:')."
+            f"The transcript below is part {part[0]} of {part[1]} of a longer meeting. "
+            "Analyze ONLY this part; the parts are merged afterwards. "
+            "Keep timestamps exactly as they appear in the transcript."
         )
-    else:
-        extra.append("Ignore speaker labels.")
+
+    # ---------------- SPEAKER HANDLING ----------------
+    extra.extend(_speaker_rules(include_speakers))
 
     # ---------------- ACTION ITEM RULES ----------------
-    extra.extend([
-        "Extract only clear, actionable tasks with an explicit verb (e.g., add, update, deploy, fix).",
-        "Each action item MUST represent exactly one unique task.",
-        "Do NOT split a single commitment into multiple tasks unless they are clearly different.",
-        "Merge overlapping or duplicate tasks into a single action item.",
-        "If ownership is mentioned, populate 'assigned_to'. Otherwise, set it to null.",
-    ])
+    extra.extend(ACTION_ITEM_RULES)
 
     # ---------------- DEADLINE RULES (FINAL & CORRECT) ----------------
-    if meeting_date:
-        extra.extend([
-            "Compute all deadlines relative to the meeting date.",
-            f"Treat the meeting date as {meeting_date} (YYYY-MM-DD).",
-
-            (
-                "WEEKDAY RESOLUTION (STRICT, NO EXCEPTIONS): "
-                "If a weekday name is mentioned WITHOUT the word 'next' "
-                "(e.g., 'Friday', 'by Friday', 'Friday morning'), "
-                "AND it matches the weekday of the meeting date, "
-                "you MUST use the MEETING DATE itself. "
-                "You are NOT allowed to move it to the next day or next week."
-            ),
-
-            (
-                "If a weekday name is mentioned WITHOUT 'next' "
-                "and it occurs later in the SAME calendar week after the meeting date, "
-                "use that same-week date."
-            ),
-
-            (
-                "If the phrase 'next <weekday>' is explicitly used "
-                "(e.g., 'next Friday'), resolve it to the weekday in the FOLLOWING week."
-            ),
-
-            # Relative phrases
-            "If someone says 'tomorrow', deadline = meeting date + 1 day.",
-            "If someone says 'day after tomorrow', deadline = meeting date + 2 days.",
-
-            # Absolute dates
-            (
-                "If an absolute date is mentioned (e.g., '18/12/2025', 'December 18, 2025'), "
-                "convert it to strict YYYY-MM-DD format."
-            ),
-
-            # Safety rules
-            "Deadlines must NEVER be earlier than the meeting date.",
-            "If resolving a deadline places it before the meeting date, use the meeting date instead.",
-            "If multiple deadlines are mentioned for the same task, choose the earliest explicit one.",
-            "If no explicit or clearly inferable deadline exists, set deadline to null.",
-            "Do NOT guess or invent deadlines.",
-            "Always output deadlines in strict YYYY-MM-DD format."
-        ])
-    else:
-        extra.append(
-            "Only extract deadlines if explicitly mentioned. "
-            "Do NOT infer or guess dates without a meeting date. "
-            "If unclear, set deadline to null."
-        )
+    extra.extend(_deadline_rules(meeting_date))
 
     # ---------------- TIMELINE RULES ----------------
-    if include_timeline:
-        extra.append(
-            "Generate a timeline only if explicit timestamps or clear time cues exist. "
-            "Do NOT invent timestamps. If unreliable, return an empty array."
-        )
-    else:
-        extra.append("DO NOT generate a timeline field.")
+    extra.append(TIMELINE_RULE if include_timeline else "DO NOT generate a timeline field.")
 
     # ---------------- SENTIMENT RULES ----------------
-    if include_sentiment:
-        extra.append(
-            "For each speaker who speaks at least once, classify sentiment as positive, neutral, or negative."
-        )
-    else:
-        extra.append("DO NOT generate speaker_sentiment.")
+    extra.append(SENTIMENT_RULE if include_sentiment else "DO NOT generate speaker_sentiment.")
 
-    extra.append(
-        "Do not include markdown, explanations, or any text outside the JSON object."
-    )
+    extra.append(NO_EXTRA_TEXT_RULE)
 
     # ---------------- FINAL PROMPT ----------------
+    return _assemble(instructions, extra, transcript, meeting_title, meeting_date)
+
+
+@_instrumented("section")
+def build_section_prompt(
+    section: str,
+    transcript: str,
+    meeting_title: str = "",
+    meeting_date: str | None = None,
+    include_speakers: bool = True,
+    language: str = "english",
+) -> str:
+    """
+    Prompt for one section of the analysis (a key of SECTION_FIELDS), carrying only
+    the rules of build_prompt that apply to that section.
+    """
+    instructions = [
+        "You are an assistant that MUST produce ONLY valid JSON and nothing else.",
+        "The input 'transcript' is a real meeting transcript.",
+        "You must produce the following JSON structure exactly (all fields must exist; empty is allowed):",
+        "{",
+    ] + SECTION_FIELDS[section] + [
+        "}",
+    ]
+
+    extra = _speaker_rules(include_speakers)
+    if section == "summary":
+        instructions.append(SUMMARY_RULE)
+    elif section == "action_items":
+        extra.extend(ACTION_ITEM_RULES)
+        extra.extend(_deadline_rules(meeting_date))
+    elif section == "timeline":
+        extra.append(TIMELINE_RULE)
+    elif section == "sentiment":
+        extra.append(SENTIMENT_RULE)
+    extra.append(NO_EXTRA_TEXT_RULE)
+
+    return _assemble(instructions, extra, transcript, meeting_title, meeting_date)
+
+
+@_instrumented("reduce")
+def build_reduce_prompt(
+    partial_summaries: list[dict],
+    meeting_title: str = "",
+    meeting_date: str | None = None,
+    language: str = "english",
+) -> str:
+    """
+    Prompt that merges the summaries of consecutive transcript chunks into one.
+    """
+    instructions = [
+        "You are an assistant that MUST produce ONLY valid JSON and nothing else.",
+        "The input is a list of summaries of consecutive parts of ONE meeting, in order.",
+        "Merge them into a single summary of the whole meeting with exactly this JSON structure:",
+        "{",
+        '  "summary_short": ["..."],',
+        '  "summary_detailed": "...",',
+        '  "discussion_flow": ["..."]',
+        "}",
+        "'summary_short' holds the 5–7 most important points of the whole meeting.",
+        "For 'summary_detailed', write a detailed summary in 2–3 separate paragraphs.",
+        "'discussion_flow' follows the order of the parts; merge repeated points.",
+        f"Write in {language}.",
+        "Do not include markdown, explanations, or any text outside the JSON object.",
+    ]
+
     prompt_parts = [
         "### INSTRUCTIONS ###",
         "\n".join(instructions),
-        "\n".join(extra),
-        "### TRANSCRIPT ###",
-        transcript,
+        "### PART SUMMARIES ###",
+        json.dumps(partial_summaries, ensure_ascii=False, indent=1),
     ]
 
     if meeting_title:
@@ -0,0 +1,232 @@
+import logging
+import re
+from typing import Optional
+import orjson
+from sqlalchemy import bindparam, text
+from backend.core.config import settings
+from backend.core.database import SessionLocal, engine
+from backend.models import Meeting, TranscriptionJob
+from backend.utils.segments import parse_segment_line
+
+logger = logging.getLogger("search_index")
+
+# One row per transcript segment, meeting summary or action item. Only `content`
+# is tokenized; the other columns locate the match.
+CREATE_SQL = """
+CREATE VIRTUAL TABLE search_index USING fts5(
+    content,
+    kind UNINDEXED,
+    source_id UNINDEXED,
+    title UNINDEXED,
+    start_seconds UNINDEXED,
+    end_seconds UNINDEXED,
+    tokenize = 'porter unicode61'
+)
+"""
+# FTS5 cannot index its UNINDEXED columns, so filtering on them scans the whole table.
+# This ordinary table maps each source to its FTS rows, for re-indexing by rowid.
+CREATE_ROWS_SQL = """
+CREATE TABLE search_index_rows (
+    rowid INTEGER PRIMARY KEY,
+    source_id TEXT NOT NULL,
+    kind TEXT NOT NULL
+)
+"""
+CREATE_ROWS_INDEX_SQL = "CREATE INDEX ix_search_index_rows_source ON search_index_rows (source_id, kind)"
+KINDS = ("segment", "summary", "action_item")
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_enabled = False
+
+
+def ensure_index():
+    """
+    Creates the FTS5 table on first start and indexes everything stored so far;
+    from then on content is indexed as each transcription or /process call finishes.
+    """
+    global _enabled
+    if not settings.SEARCH_ENABLED or engine.dialect.name != "sqlite":
+        logger.info("Full-text search is disabled")
+        return
+
+    with engine.begin() as conn:
+        tables = {
+            name for (name,) in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'search_index%'")
+            )
+        }
+        exists = "search_index" in tables
+        if not exists:
+            conn.execute(text(CREATE_SQL))
+        if "search_index_rows" not in tables:
+            conn.execute(text(CREATE_ROWS_SQL))
+            conn.execute(text(CREATE_ROWS_INDEX_SQL))
+            # Index built before the row map existed: map its rows once
+            conn.execute(text(
+                "INSERT INTO search_index_rows (rowid, source_id, kind) SELECT rowid, source_id, kind FROM search_index"
+            ))
+    _enabled = True
+
+    if not exists:
+        _backfill()
+
+
+def _backfill():
+    with SessionLocal() as db:
+        jobs = (
+            db.query(TranscriptionJob.id, TranscriptionJob.filename, TranscriptionJob.transcript)
+            .filter(TranscriptionJob.status == "done", TranscriptionJob.transcript.isnot(None))
+            .all()
+        )
+        meetings = db.query(Meeting.id, Meeting.result).all()
+
+    for job_id, filename, transcript in jobs:
+        index_transcript(job_id, filename, transcript)
+    for meeting_id, result in meetings:
+        index_meeting(meeting_id, orjson.loads(result))
+    logger.info(f"Indexed {len(jobs)} transcript(s) and {len(meetings)} meeting(s) for search")
+
+
+def _replace(kinds: tuple[str, ...], source_id: str, rows: list[dict]):
+    """
+    Re-indexes one source: its old rows are dropped so indexing is idempotent. Rows
+    are found through search_index_rows and deleted by rowid, without scanning the index.
+    """
+    with SessionLocal() as db:
+        # A write first, so this transaction holds SQLite's write lock from here on
+        old_rowids = db.execute(
+            text(
+                "DELETE FROM search_index_rows WHERE source_id = :source_id AND kind IN :kinds RETURNING rowid"
+            ).bindparams(bindparam("kinds", expanding=True)),
+            {"source_id": source_id, "kinds": list(kinds)},
+        ).scalars().all()
+        if old_rowids:
+            db.execute(
+                text("DELETE FROM search_index WHERE rowid IN :rowids").bindparams(bindparam("rowids", expanding=True)),
+                {"rowids": old_rowids},
+            )
+        if rows:
+            # Explicit rowids, so the row map is written in the same batch; with the
+            # write lock held no other writer can take them
+            last = db.execute(text("SELECT rowid FROM search_index ORDER BY rowid DESC LIMIT 1")).scalar() or 0
+            rows = [{**row, "rowid": last + i} for i, row in enumerate(rows, start=1)]
+            db.execute(
+                text(
+                    "INSERT INTO search_index (rowid, content, kind, source_id, title, start_seconds, end_seconds) "
+                    "VALUES (:rowid, :content, :kind, :source_id, :title, :start, :end)"
+                ),
+                rows,
+            )
+            db.execute(
+                text("INSERT INTO search_index_rows (rowid, source_id, kind) VALUES (:rowid, :source_id, :kind)"),
+                rows,
+            )
+        db.commit()
+
+
+def index_transcript(job_id: str, filename: str, transcript: str):
+    """Indexes each "[start - end] text" segment of a finished transcription with its timestamps."""
+    if not _enabled or not transcript:
+        return
+    rows = []
+    for line in transcript.splitlines():
+        segment = parse_segment_line(line) or {"text": line.strip(), "start": None, "end": None}
+        if segment["text"]:
+            rows.append({
+                "content": segment["text"],
+                "kind": "segment",
+                "source_id": job_id,
+                "title": filename,
+                "start": segment["start"],
+                "end": segment["end"],
+            })
+    _replace(("segment",), job_id, rows)
+
+
+def index_meeting(meeting_id: int, result: dict):
+    """Indexes a processed meeting's detailed summary and its action items."""
+    if not _enabled:
+        return
+    title = result.get("meeting_title")
+    source_id = str(meeting_id)
+    rows = []
+    if result.get("summary_detailed"):
+        rows.append({
+            "content": result["summary_detailed"], "kind": "summary",
+            "source_id": source_id, "title": title, "start": None, "end": None,
+        })
+    for item in result.get("action_items") or []:
+        owner = f" ({item['assigned_to']})" if item.get("assigned_to") else ""
+        rows.append({
+            "content": f"{item['task']}{owner}", "kind": "action_item",
+            "source_id": source_id, "title": title, "start": None, "end": None,
+        })
+    _replace(("summary", "action_item"), source_id, rows)
+
+
+def _match_expression(query: str) -> str:
+    # Quote every term so user input can never be read as FTS5 query syntax;
+    # the terms are ANDed and the last one also matches as a prefix.
+    terms = TERM_RE.findall(query)
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _timestamp(seconds: Optional[float]) -> Optional[str]:
+    if seconds is None:
+        return None
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def search(query: str, kind: Optional[str] = None, limit: int = 20, offset: int = 0) -> Optional[dict]:
+    """
+    Best matches first (bm25), each with a highlighted snippet. Segment hits carry
+    the job id and start/end seconds to jump to; summary and action item hits carry
+    the meeting id. Returns None when search is disabled.
+    """
+    if not _enabled:
+        return None
+    match = _match_expression(query)
+    if not match:
+        return {"query": query, "results": []}
+
+    sql = (
+        "SELECT kind, source_id, title, start_seconds, end_seconds, "
+        "snippet(search_index, 0, '<mark>', '</mark>', '…', 16) AS snippet, "
+        "bm25(search_index) AS score "
+        "FROM search_index WHERE search_index MATCH :match"
+    )
+    params = {"match": match, "limit": limit, "offset": offset}
+    if kind:
+        sql += " AND kind = :kind"
+        params["kind"] = kind
+    sql += " ORDER BY score LIMIT :limit OFFSET :offset"
+
+    with SessionLocal() as db:
+        rows = db.execute(text(sql), params).all()
+
+    results = []
+    for row in rows:
+        hit = {
+            "kind": row.kind,
+            "title": row.title,
+            "snippet": row.snippet,
+            # bm25 is lower-is-better; flip it so higher scores rank higher
+            "score": round(-row.score, 4),
+        }
+        if row.kind == "segment":
+            hit.update(
+                job_id=row.source_id,
+                start=row.start_seconds,
+                end=row.end_seconds,
+                timestamp=_timestamp(row.start_seconds),
+            )
+        else:
+            hit["meeting_id"] = int(row.source_id)
+        results.append(hit)
+    return {"query": query, "results": results}
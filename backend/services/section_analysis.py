@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from backend.services.admission import Overloaded
+from backend.services.llm_resilience import LLMError
+from backend.services.prompt_builder import build_section_prompt
+from backend.utils.validators import normalize_analysis, parse_llm_json
+
+logger = logging.getLogger("section_analysis")
+
+# Response fields produced by each section, with the value used when it fails
+SECTION_DEFAULTS = {
+    "summary": {"summary_short": [], "summary_detailed": "", "discussion_flow": []},
+    "action_items": {"action_items": []},
+    "timeline": {"timeline": []},
+    "sentiment": {"speaker_sentiment": {}},
+}
+
+
+def _extract(section: str, parsed: dict) -> dict:
+    """
+    Picks the section's fields out of the model output after the same repairs as
+    single mode (normalize_analysis); only what those cannot fix is rejected.
+    """
+    parsed = normalize_analysis(parsed)
+    fields = {}
+    for name, default in SECTION_DEFAULTS[section].items():
+        value = parsed.get(name, default)
+        if not isinstance(value, type(default)):
+            raise ValueError(f"'{name}' should be a {type(default).__name__}, got {type(value).__name__}")
+        fields[name] = value
+    return fields
+
+
+async def analyze_sections(
+    req, llm, transcript: str, include_sentiment: bool, include_timeline: bool
+) -> dict:
+    """
+    Generates each section from its own smaller prompt, all concurrently, and assembles
+    them into one ProcessResponse-shaped dict. A failed section comes back empty and is
+    named in "errors"; only when every section fails is an error raised.
+    """
+    sections = ["summary", "action_items"]
+    if include_timeline:
+        sections.append("timeline")
+    if include_sentiment:
+        sections.append("sentiment")
+
+    async def run(section: str) -> dict:
+        prompt = build_section_prompt(
+            section,
+            transcript=transcript,
+            meeting_title=req.meeting_title,
+            meeting_date=req.meeting_date,
+            include_speakers=req.include_speakers,
+            language=req.language,
+        )
+        return _extract(section, parse_llm_json(await llm.acomplete(prompt)))
+
+    results = await asyncio.gather(*(run(s) for s in sections), return_exceptions=True)
+
+    parsed, errors = {}, {}
+    for section, result in zip(sections, results):
+        if isinstance(result, Exception):
+            logger.error(f"Section '{section}' failed: {result}")
+            errors[section] = str(result)
+            result = SECTION_DEFAULTS[section]
+        parsed.update(result)
+
+    if len(errors) == len(sections):
+        # Refused for capacity (429) or the provider failing (502/504) rather than bad output
+        for kind in (Overloaded, LLMError):
+            failures = [r for r in results if isinstance(r, kind)]
+            if failures:
+                raise failures[0]
+        raise ValueError(f"Every section failed: {errors}")
+
+    parsed.setdefault("timeline", [])
+    parsed.setdefault("speaker_sentiment", {})
+    parsed["errors"] = errors
+    return parsed
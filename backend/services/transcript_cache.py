@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import func
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models import TranscriptCacheEntry
+
+logger = logging.getLogger("transcript_cache")
+
+
+def cache_key(audio_sha256: str, profile: str, vad: bool) -> str:
+    """Same audio, model, decoding profile and silence handling always produce the same transcript."""
+    key = f"{audio_sha256}:{settings.WHISPER_MODEL_SIZE}:{settings.WHISPER_COMPUTE_TYPE}:{profile}"
+    return f"{key}:vad" if vad else key
+
+
+def get(key: str) -> Optional[dict]:
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return None
+    with SessionLocal() as db:
+        entry = db.get(TranscriptCacheEntry, key)
+        if entry is None:
+            return None
+        entry.hits += 1
+        entry.last_accessed_at = datetime.now(timezone.utc)
+        db.commit()
+        return {
+            "transcript": entry.transcript,
+            "audio_duration": entry.audio_duration,
+            "skipped_seconds": entry.skipped_seconds,
+        }
+
+
+def put(
+    key: str,
+    transcript: str,
+    audio_duration: Optional[float] = None,
+    skipped_seconds: Optional[float] = None,
+):
+    if not settings.TRANSCRIPT_CACHE_ENABLED:
+        return
+    size = len(transcript.encode("utf-8"))
+    if size > settings.TRANSCRIPT_CACHE_MAX_BYTES:
+        return
+    with SessionLocal() as db:
+        entry = db.get(TranscriptCacheEntry, key)
+        if entry is None:
+            entry = TranscriptCacheEntry(key=key, hits=0)
+            db.add(entry)
+        entry.transcript = transcript
+        entry.size_bytes = size
+        entry.audio_duration = audio_duration
+        entry.skipped_seconds = skipped_seconds
+        entry.last_accessed_at = datetime.now(timezone.utc)
+        db.commit()
+        _evict(db)
+
+
+def _evict(db):
+    """Drops least recently used transcripts until the cache fits in TRANSCRIPT_CACHE_MAX_BYTES."""
+    total = db.query(func.coalesce(func.sum(TranscriptCacheEntry.size_bytes), 0)).scalar()
+    if total <= settings.TRANSCRIPT_CACHE_MAX_BYTES:
+        return
+
+    evicted = 0
+    for key, size in (
+        db.query(TranscriptCacheEntry.key, TranscriptCacheEntry.size_bytes)
+        .order_by(TranscriptCacheEntry.last_accessed_at)
+        .all()
+    ):
+        if total <= settings.TRANSCRIPT_CACHE_MAX_BYTES:
+            break
+        db.query(TranscriptCacheEntry).filter(TranscriptCacheEntry.key == key).delete()
+        total -= size
+        evicted += 1
+    db.commit()
+    logger.info(f"Evicted {evicted} transcript(s) from the cache")
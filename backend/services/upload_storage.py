@@ -0,0 +1,217 @@
+import hashlib
+import os
+import uuid
+from typing import AsyncIterator, Optional
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from backend.core.config import settings
+from backend.core.database import SessionLocal
+from backend.models import UploadSession
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadSessionError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def upload_path(file_id: str, filename: str) -> str:
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    return os.path.join(settings.UPLOAD_DIR, f"{file_id}_{os.path.basename(filename)}")
+
+
+async def iter_upload_file(file: UploadFile, chunk_size: int) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def write_chunks(chunks: AsyncIterator[bytes], f, limit: int, hasher=None) -> int:
+    """
+    Writes chunks to an open file without ever holding more than one chunk in memory.
+    Raises UploadTooLarge as soon as more than `limit` bytes have arrived.
+    """
+    written = 0
+    async for chunk in chunks:
+        written += len(chunk)
+        if written > limit:
+            raise UploadTooLarge(f"Upload exceeds the maximum size of {settings.MAX_UPLOAD_BYTES} bytes")
+        if hasher is not None:
+            hasher.update(chunk)
+        await run_in_threadpool(f.write, chunk)
+    return written
+
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def save_upload(file: UploadFile, dest: str) -> str:
+    """
+    Streams a multipart upload to `dest`, hashing it on the way, and returns its sha256.
+    The partial file is removed on failure.
+    """
+    hasher = hashlib.sha256()
+    try:
+        f = await run_in_threadpool(open, dest, "wb")
+        try:
+            await write_chunks(
+                iter_upload_file(file, settings.UPLOAD_CHUNK_SIZE), f, settings.MAX_UPLOAD_BYTES, hasher
+            )
+        finally:
+            await run_in_threadpool(f.close)
+        return hasher.hexdigest()
+    except BaseException:
+        if os.path.exists(dest):
+            await run_in_threadpool(os.remove, dest)
+        raise
+
+
+# ---------------- Chunked / resumable sessions ----------------
+
+def session_to_dict(session: UploadSession) -> dict:
+    return {
+        "upload_id": session.id,
+        "filename": session.filename,
+        "total_size": session.total_size,
+        "received_bytes": session.received_bytes,
+        "status": session.status,
+        "chunk_size": settings.UPLOAD_CHUNK_SIZE,
+    }
+
+
+def create_session(
+    filename: str,
+    total_size: int,
+    callback_url: Optional[str] = None,
+    profile: Optional[str] = None,
+    vad: Optional[bool] = None,
+) -> dict:
+    if total_size > settings.MAX_UPLOAD_BYTES:
+        raise UploadTooLarge(f"Upload exceeds the maximum size of {settings.MAX_UPLOAD_BYTES} bytes")
+
+    upload_id = str(uuid.uuid4())
+    path = upload_path(upload_id, filename) + ".part"
+    open(path, "wb").close()
+
+    with SessionLocal() as db:
+        session = UploadSession(
+            id=upload_id,
+            filename=filename,
+            path=path,
+            total_size=total_size,
+            callback_url=callback_url,
+            profile=profile,
+            vad=vad,
+        )
+        db.add(session)
+        db.commit()
+        db.refresh(session)
+        return session_to_dict(session)
+
+
+def get_session(upload_id: str) -> Optional[dict]:
+    with SessionLocal() as db:
+        session = db.get(UploadSession, upload_id)
+        return session_to_dict(session) if session else None
+
+
+def _open_session(upload_id: str) -> UploadSession:
+    with SessionLocal() as db:
+        session = db.get(UploadSession, upload_id)
+        if session is None:
+            raise UploadSessionError(404, "Upload session not found")
+        if session.status != "open":
+            raise UploadSessionError(409, f"Upload session is {session.status}")
+        db.expunge(session)
+        return session
+
+
+def _set_received(upload_id: str, received: int):
+    with SessionLocal() as db:
+        db.query(UploadSession).filter(UploadSession.id == upload_id).update(
+            {"received_bytes": received}, synchronize_session=False
+        )
+        db.commit()
+
+
+async def append_chunk(upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> dict:
+    """
+    Appends one part of a chunked upload at `offset`. The offset must equal the bytes
+    received so far, so an interrupted client resumes from GET /upload/sessions/{id}.
+    """
+    session = await run_in_threadpool(_open_session, upload_id)
+    if offset != session.received_bytes:
+        raise UploadSessionError(
+            409, f"Expected offset {session.received_bytes}, got {offset}"
+        )
+
+    remaining = session.total_size - session.received_bytes
+    # File calls go to the threadpool, like the writes in write_chunks
+    f = await run_in_threadpool(open, session.path, "r+b")
+    try:
+        await run_in_threadpool(f.seek, offset)
+        try:
+            written = await write_chunks(chunks, f, remaining)
+        except UploadTooLarge:
+            # Drop whatever part of this chunk was written; the session stays resumable.
+            await run_in_threadpool(f.truncate, offset)
+            raise UploadSessionError(413, "Chunk goes past the declared total_size")
+    finally:
+        await run_in_threadpool(f.close)
+
+    await run_in_threadpool(_set_received, upload_id, offset + written)
+    return await run_in_threadpool(get_session, upload_id)
+
+
+def _received_session(upload_id: str) -> UploadSession:
+    session = _open_session(upload_id)
+    if session.received_bytes != session.total_size:
+        raise UploadSessionError(
+            409, f"Upload incomplete: {session.received_bytes} of {session.total_size} bytes received"
+        )
+    return session
+
+
+def hash_session(upload_id: str) -> dict:
+    """
+    Hashes a fully received upload and returns it with the session's job options.
+    The session stays open, so the caller can still refuse it and let the client retry.
+    """
+    session = _received_session(upload_id)
+    # Parts may arrive across requests and restarts, so hash the assembled file once
+    return {"audio_sha256": file_sha256(session.path), "profile": session.profile, "vad": session.vad}
+
+
+def complete_session(upload_id: str, audio_sha256: str) -> dict:
+    """Moves a fully received upload, hashed by hash_session, into place and returns its file id and path."""
+    session = _received_session(upload_id)
+    dest = session.path[: -len(".part")]
+    os.replace(session.path, dest)
+
+    with SessionLocal() as db:
+        db.query(UploadSession).filter(UploadSession.id == upload_id).update(
+            {"status": "complete"}, synchronize_session=False
+        )
+        db.commit()
+
+    return {
+        "file_id": upload_id,
+        "filename": session.filename,
+        "path": dest,
+        "callback_url": session.callback_url,
+        "profile": session.profile,
+        "audio_sha256": audio_sha256,
+        "vad": session.vad,
+    }
@@ -0,0 +1,106 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object as its text arrives in pieces and reports every top-level
+    field as soon as its value is complete. Elements of top-level arrays are also
+    reported one by one, before the array itself is finished.
+
+    feed() returns a list of events:
+      ("item", field, index, value)  - one element of the array in `field`
+      ("field", field, value)        - the complete value of `field`
+    Anything before the first "{" (such as a markdown code fence) is ignored.
+    Values that fail to parse are skipped; the caller still parses the full text at the end.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.done = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.in_array = False
+        self.item_start = None
+        self.item_index = 0
+
+    def feed(self, text: str) -> list[tuple]:
+        self.buffer += text
+        events = []
+        buf = self.buffer
+
+        while self.pos < len(buf) and not self.done:
+            ch = buf[self.pos]
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif self.depth == 0:
+                if ch == "{":
+                    self.depth = 1
+                    self.key_start = self.pos + 1
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if self.depth == 1 and ch == "[" and not buf[self.value_start:self.pos].strip():
+                    self.in_array = True
+                    self.item_start = self.pos + 1
+                    self.item_index = 0
+                self.depth += 1
+            elif ch in "}]":
+                if self.depth == 2 and self.in_array:
+                    self._emit_item(buf[self.item_start:self.pos], events)
+                    self.in_array = False
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit_field(buf[self.value_start:self.pos] if self.value_start else "", events)
+                    self.done = True
+            elif ch == ":" and self.depth == 1 and self.value_start is None:
+                self.key = self._load(buf[self.key_start:self.pos])
+                self.value_start = self.pos + 1
+            elif ch == ",":
+                if self.depth == 1:
+                    self._emit_field(buf[self.value_start:self.pos] if self.value_start else "", events)
+                    self.key_start = self.pos + 1
+                    self.value_start = None
+                elif self.depth == 2 and self.in_array:
+                    self._emit_item(buf[self.item_start:self.pos], events)
+                    self.item_start = self.pos + 1
+
+            self.pos += 1
+
+        return events
+
+    @staticmethod
+    def _load(text: str):
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def _emit_item(self, text: str, events: list):
+        # Empty slices come from "[]" and trailing commas
+        if not text.strip() or not isinstance(self.key, str):
+            return
+        value = self._load(text)
+        if value is not None:
+            events.append(("item", self.key, self.item_index, value))
+            self.item_index += 1
+
+    def _emit_field(self, text: str, events: list):
+        if not text.strip() or not isinstance(self.key, str):
+            return
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return
+        events.append(("field", self.key, value))
+        self.key = None
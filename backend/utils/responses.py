@@ -0,0 +1,9 @@
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson, for already-validated payloads."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
@@ -0,0 +1,17 @@
+import re
+
+# Transcripts are stored one segment per line: "[start - end] text"
+SEGMENT_LINE_RE = re.compile(r"^\[(\d+(?:\.\d+)?) - (\d+(?:\.\d+)?)\] ?(.*)$")
+
+
+def format_segment(start: float, end: float, text: str) -> str:
+    return f"[{start:.2f} - {end:.2f}] {text}"
+
+
+def parse_segment_line(line: str) -> dict | None:
+    """Inverse of format_segment, for transcripts read back from storage."""
+    match = SEGMENT_LINE_RE.match(line)
+    if not match:
+        return None
+    start, end, text = float(match.group(1)), float(match.group(2)), match.group(3)
+    return {"start": start, "end": end, "text": text, "line": line}
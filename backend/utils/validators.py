@@ -1,7 +1,202 @@
-import json
+import logging
+import re
+import orjson
+from backend.core.metrics import Counter
+from backend.core.tracing import span
 
-def ensure_json_serializable(obj):
-    try:
-        json.dumps(obj)
-    except Exception as e:
-        raise ValueError("Returned object is not JSON serializable: " + str(e))
+logger = logging.getLogger("validators")
+
+LLM_JSON_PARSES = Counter(
+    "llm_json_parse_total",
+    "LLM outputs parsed: direct (bare JSON), extracted (needed the fallback extractor) or failed",
+    ("result",),
+)
+
+# Tail of a truncated object that ends in a key with no value, e.g. `, "timeline": `
+DANGLING_KEY_RE = re.compile(r',?\s*"(?:[^"\\]|\\.)*"\s*:\s*$')
+# Tail of a truncated object that ends in a cut-off literal or number, e.g. `tru`, `nul`, `1.`
+PARTIAL_SCALAR_RE = re.compile(r"(?:\b(?:t|tr|tru|f|fa|fal|fals|n|nu|nul)|-?\d*\.|-?\d+(?:\.\d*)?[eE][-+]?|-)$")
+CLOSERS = {"{": "}", "[": "]"}
+
+
+def extract_json_object(text: str) -> str:
+    """
+    Returns the outermost balanced JSON object in `text`, found in one linear pass
+    that respects strings and escapes. Leading prose or code fences are skipped,
+    trailing commas before "}" / "]" are dropped, and an object cut off mid-way
+    (e.g. the model hit its output limit) is closed off, dropping a member whose
+    key or value was cut short.
+    This is the slow path; parse_llm_json tries the text between the outer braces first.
+    Raises ValueError if the text contains no "{".
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("LLM did not return JSON.")
+
+    out = []
+    stack = []
+    in_string = escape = False
+    # Where the key of an object member without a value yet starts in `out`
+    key_start = None
+    expect_key = after_colon = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if after_colon and not ch.isspace():
+            # The member's value has started
+            key_start = None
+            after_colon = False
+
+        if ch == '"':
+            in_string = True
+            if expect_key:
+                key_start = len(out)
+                expect_key = False
+        elif ch == ":":
+            after_colon = True
+        elif ch == ",":
+            expect_key = bool(stack) and stack[-1] == "{"
+        elif ch in "{[":
+            stack.append(ch)
+            expect_key = ch == "{"
+        elif ch in "}]":
+            key_start = None
+            expect_key = False
+            # Drop a trailing comma: `[1, 2,]` / `{"a": 1,}`
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out)
+            continue
+        out.append(ch)
+
+    # Truncated output: drop a member cut off in its key, close the open string,
+    # drop a cut-off literal and a dangling key or comma, close brackets
+    if key_start is not None:
+        del out[key_start:]
+    elif in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = PARTIAL_SCALAR_RE.sub("", "".join(out))
+    repaired = DANGLING_KEY_RE.sub("", repaired).rstrip().rstrip(",")
+    logger.warning("LLM output was truncated; closing the JSON object locally.")
+    return repaired + "".join(CLOSERS[c] for c in reversed(stack))
+
+
+def _parse_extracted(text: str):
+    # Fenced or prose-wrapped output is usually intact between its outer braces;
+    # only when that fails is the object scanned for character by character
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            return orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError:
+            pass
+    return orjson.loads(extract_json_object(text))
+
+
+def parse_llm_json(output_text: str) -> dict:
+    """
+    Parses the JSON object the model was asked to return.
+    Raises ValueError if no JSON object can be recovered from the output.
+    """
+    with span("llm.parse", chars=len(output_text)) as current:
+        # The model MUST return JSON; the common case parses directly.
+        try:
+            parsed = orjson.loads(output_text)
+            result = "direct"
+        except orjson.JSONDecodeError:
+            logger.info("LLM output is not bare JSON; extracting the JSON object.")
+            try:
+                parsed = _parse_extracted(output_text)
+                result = "extracted"
+            except orjson.JSONDecodeError as e:
+                LLM_JSON_PARSES.inc(result="failed")
+                raise ValueError(f"Failed to parse model JSON: {e}")
+            except ValueError:
+                LLM_JSON_PARSES.inc(result="failed")
+                raise
+
+        if not isinstance(parsed, dict):
+            LLM_JSON_PARSES.inc(result="failed")
+            raise ValueError("LLM did not return a JSON object.")
+        LLM_JSON_PARSES.inc(result=result)
+        current.set_attribute("result", result)
+        return parsed
+
+
+def _as_text(value) -> str | None:
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value if v is not None) or None
+    return value if isinstance(value, str) else str(value)
+
+
+def _as_text_list(value) -> list[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [line.strip(" -•*\t") for line in value.splitlines() if line.strip(" -•*\t")]
+    if isinstance(value, list):
+        return [_as_text(v) for v in value if v is not None and v != ""]
+    return [_as_text(value)]
+
+
+def normalize_analysis(parsed: dict) -> dict:
+    """
+    Repairs the usual shape mistakes in model output so it validates as a
+    ProcessResponse instead of failing the request: missing sections become empty,
+    a string where a list is expected is split into lines, a list where a string
+    is expected is joined, and action items or timeline entries without their
+    required fields are dropped.
+    """
+    result = dict(parsed)
+
+    result["summary_short"] = _as_text_list(parsed.get("summary_short"))
+    result["discussion_flow"] = _as_text_list(parsed.get("discussion_flow"))
+
+    detailed = parsed.get("summary_detailed")
+    if isinstance(detailed, list):
+        detailed = "\n\n".join(_as_text(p) for p in detailed if p)
+    result["summary_detailed"] = _as_text(detailed) or ""
+
+    action_items = []
+    for item in parsed.get("action_items") or []:
+        if isinstance(item, str):
+            item = {"task": item}
+        if not isinstance(item, dict) or not item.get("task"):
+            continue
+        action_items.append({
+            "task": _as_text(item["task"]),
+            "assigned_to": _as_text(item.get("assigned_to")),
+            "deadline": _as_text(item.get("deadline")),
+        })
+    result["action_items"] = action_items
+
+    timeline = []
+    for entry in parsed.get("timeline") or []:
+        if isinstance(entry, dict) and entry.get("timestamp") is not None and entry.get("topic"):
+            timeline.append({"timestamp": _as_text(entry["timestamp"]), "topic": _as_text(entry["topic"])})
+    result["timeline"] = timeline
+
+    sentiment = parsed.get("speaker_sentiment")
+    result["speaker_sentiment"] = (
+        {str(k): _as_text(v) for k, v in sentiment.items() if v is not None}
+        if isinstance(sentiment, dict) else {}
+    )
+    return result
@@ -0,0 +1,99 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import datetime, timezone
+
+# Each benchmark is timed in REPEATS rounds of enough calls to last ~MIN_ROUND_SECONDS
+REPEATS = 7
+MIN_ROUND_SECONDS = 0.05
+
+_benchmarks: dict[str, callable] = {}
+
+
+def benchmark(name: str):
+    """Registers a zero-argument callable as benchmark `name`."""
+    def register(fn):
+        _benchmarks[name] = fn
+        return fn
+    return register
+
+
+def _calls_per_round(fn) -> int:
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= MIN_ROUND_SECONDS or number >= 1_000_000:
+            return number
+        number *= 2
+
+
+def run(pattern: str | None = None) -> dict:
+    """Times every registered benchmark whose name contains `pattern`; results in microseconds per call."""
+    results = {}
+    for name, fn in _benchmarks.items():
+        if pattern and pattern not in name:
+            continue
+        number = _calls_per_round(fn)
+        rounds = [t / number * 1e6 for t in timeit.repeat(fn, number=number, repeat=REPEATS)]
+        results[name] = {
+            "median_us": round(statistics.median(rounds), 3),
+            "min_us": round(min(rounds), 3),
+            "stdev_us": round(statistics.stdev(rounds), 3),
+            "calls_per_round": number,
+        }
+        print(f"{name:<55} {results[name]['min_us']:>14,.1f} us")
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save(results: dict, path: str):
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} result(s) to {path}")
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list[str]:
+    """
+    Prints each benchmark's change against the baseline and returns the names that
+    got slower by more than `threshold` (0.2 = 20%). The fastest rounds are compared:
+    noise from other processes only ever adds time, so the minimum is the steadiest figure.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        if name not in baseline:
+            print(f"{name:<55} {'-':>12} {current['min_us']:>12,.1f}      new")
+            continue
+        before = baseline[name]["min_us"]
+        change = (current["min_us"] - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<55} {before:>12,.1f} {current['min_us']:>12,.1f} {change:>+8.1%}{flag}")
+    return regressions
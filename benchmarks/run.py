@@ -0,0 +1,194 @@
+"""
+Microbenchmarks for the backend hot paths.
+
+    python -m benchmarks.run                          # run everything
+    python -m benchmarks.run --save baseline.json     # record a baseline
+    python -m benchmarks.run --compare baseline.json  # exit 1 on regressions
+    python -m benchmarks.run --filter prompt          # only names containing "prompt"
+
+Run from the repository root. /process is exercised end to end in stub mode
+(no GOOGLE_API_KEY) against a throwaway SQLite database.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+# Configure the app before any backend module reads its settings
+_tmp = tempfile.mkdtemp(prefix="minutemind-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.sqlite3')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp, "uploads")
+os.environ["GOOGLE_API_KEY"] = ""
+os.environ["WHISPER_WARMUP"] = "false"
+
+from types import SimpleNamespace  # noqa: E402
+
+from benchmarks.harness import benchmark, compare, run, save  # noqa: E402
+from backend.schemas import ProcessResponse  # noqa: E402
+import backend.services.audio_transcribe as audio_transcribe  # noqa: E402
+from backend.services.audio_preprocess import TimestampMap  # noqa: E402
+from backend.services.meeting_processor import TIMESTAMP_RE  # noqa: E402
+from backend.services.prompt_builder import build_prompt, compact_transcript  # noqa: E402
+from backend.utils.validators import normalize_analysis, parse_llm_json  # noqa: E402
+
+SPEAKERS = ["Alice", "Bob", "Carol", "Dave"]
+SENTENCES = [
+    "um, so I think we should, uh, move the release to next Friday.",
+    "The migration freeze starts tomorrow and lasts until the end of the month.",
+    "Can you update the dashboard and deploy it by Wednesday?",
+    "I'm not sure the load tests cover the new batch endpoint yet.",
+    "Let's add monitoring for the queue depth before we scale out.",
+]
+
+
+def whisper_transcript(segments: int) -> str:
+    lines, t = [], 0.0
+    for i in range(segments):
+        text = f"{SPEAKERS[i % 4]}: {SENTENCES[i % 5]}"
+        lines.append(audio_transcribe.format_segment(t, t + 4.2, text))
+        t += 4.5
+    return "\n".join(lines)
+
+
+def plain_transcript(lines: int) -> str:
+    return "\n".join(f"{SPEAKERS[i % 4]}: {SENTENCES[i % 5]}" for i in range(lines))
+
+
+TRANSCRIPTS = {
+    "small": whisper_transcript(20),      # ~2k chars
+    "medium": whisper_transcript(200),    # ~20k chars
+    "large": whisper_transcript(2000),    # ~200k chars, a ~2.5 hour meeting
+}
+PLAIN_LARGE = plain_transcript(2000)
+
+
+# ---------------- build_prompt ----------------
+
+for size, transcript in TRANSCRIPTS.items():
+    for label, flags in {
+        "all": dict(include_speakers=True, include_sentiment=True, include_timeline=True),
+        "minimal": dict(include_speakers=False, include_sentiment=False, include_timeline=False),
+    }.items():
+        benchmark(f"build_prompt[{size},{label}]")(
+            lambda transcript=transcript, flags=flags: build_prompt(
+                transcript, "Weekly sync", "2025-12-18", **flags
+            )
+        )
+    benchmark(f"compact_transcript[{size}]")(lambda transcript=transcript: compact_transcript(transcript))
+
+
+# ---------------- timestamp detection ----------------
+
+benchmark("timestamp_regex[large,match]")(lambda: TIMESTAMP_RE.search(TRANSCRIPTS["large"]))
+# No timestamps anywhere: the regex has to scan the whole transcript
+benchmark("timestamp_regex[large,no-match]")(lambda: TIMESTAMP_RE.search(PLAIN_LARGE))
+
+
+# ---------------- JSON extraction and validation ----------------
+
+ANALYSIS = {
+    "summary_short": [f"Point {i}: {SENTENCES[i % 5]}" for i in range(7)],
+    "summary_detailed": "\n\n".join(SENTENCES * 6),
+    "discussion_flow": [SENTENCES[i % 5] for i in range(12)],
+    "timeline": [{"timestamp": f"{i:02d}:00", "topic": SENTENCES[i % 5]} for i in range(20)],
+    "action_items": [
+        {"task": SENTENCES[i % 5], "assigned_to": SPEAKERS[i % 4], "deadline": "2025-12-19"} for i in range(15)
+    ],
+    "speaker_sentiment": {name: "positive" for name in SPEAKERS},
+}
+CLEAN = json.dumps(ANALYSIS, indent=2)
+LLM_OUTPUTS = {
+    "clean": CLEAN,
+    "fenced": f"```json\n{CLEAN}\n```",
+    "prose": f"Here is the analysis you asked for:\n\n{CLEAN}\n\nLet me know if you need anything else.",
+    "trailing-commas": CLEAN.replace("]\n", "],\n").replace("}\n", "},\n").replace('"\n', '",\n'),
+    "truncated": CLEAN[: int(len(CLEAN) * 0.8)],
+}
+
+for label, output in LLM_OUTPUTS.items():
+    benchmark(f"parse_llm_json[{label}]")(lambda output=output: parse_llm_json(output))
+
+benchmark("validate_response[normalize+model_validate]")(
+    lambda: ProcessResponse.model_validate(normalize_analysis(ANALYSIS))
+)
+
+
+# ---------------- transcript formatting ----------------
+
+class _SyntheticModel:
+    """Stands in for WhisperModel so only the segment formatting path is timed."""
+
+    def __init__(self, count: int):
+        self.segments = [
+            SimpleNamespace(start=i * 4.5, end=i * 4.5 + 4.2, text=f" {SENTENCES[i % 5]}") for i in range(count)
+        ]
+
+    def transcribe(self, audio, **options):
+        return iter(self.segments), SimpleNamespace(duration=len(self.segments) * 4.5)
+
+
+def format_transcript(model, timestamp_map=None) -> str:
+    audio_transcribe._model = model
+    segments, _ = audio_transcribe.transcribe_segments(None, "fast", timestamp_map)
+    return "\n".join(segment["line"] for segment in segments)
+
+
+for count in (1_000, 10_000):
+    model = _SyntheticModel(count)
+    benchmark(f"format_segments[{count}]")(lambda model=model: format_transcript(model))
+
+# Silence-stripped audio: every segment goes through the timestamp map
+_regions = [(i * 16000 * 60, i * 16000 * 60 + 16000 * 45) for i in range(200)]
+_model_10k = _SyntheticModel(10_000)
+benchmark("format_segments[10000,vad-map]")(lambda: format_transcript(_model_10k, TimestampMap(_regions)))
+
+
+# ---------------- /process end to end ----------------
+
+def _process_benchmarks():
+    from fastapi.testclient import TestClient
+    from backend.main import app
+
+    client = TestClient(app)
+    client.__enter__()
+    for size in ("small", "large"):
+        payload = {"transcript": TRANSCRIPTS[size], "meeting_title": "Weekly sync", "meeting_date": "2025-12-18"}
+
+        def call(payload=payload):
+            r = client.post("/process", json=payload)
+            assert r.status_code == 200, r.text
+
+        benchmark(f"process_endpoint[{size},stub]")(call)
+    return client
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Backend microbenchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="slowdown flagged as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--filter", metavar="TEXT", help="only run benchmarks whose name contains TEXT")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    client = _process_benchmarks()
+    try:
+        results = run(args.filter)
+    finally:
+        client.__exit__(None, None, None)
+
+    if args.save:
+        save(results, args.save)
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,8 @@ from components.ui import render_summary, render_action_items, render_timeline,
 from datetime import datetime
 
 API_URL = "http://127.0.0.1:8000"
+UPLOAD_CHUNK_BYTES = 4 * 1024 * 1024
+UPLOAD_RETRIES = 3
 
 # Custom CSS for modern UI
 st.set_page_config(
@@ -181,6 +183,146 @@ if "upload_response" not in st.session_state:
 if "processing_result" not in st.session_state:
     st.session_state.processing_result = None
 
+def upload_in_chunks(uploaded, profile=None, vad=None):
+    """
+    Sends the file through the chunked upload API, resuming from the server's
+    offset if a chunk fails. Returns the final /upload response.
+    """
+    resp = requests.post(
+        f"{API_URL}/upload/sessions",
+        json={"filename": uploaded.name, "total_size": uploaded.size, "profile": profile, "vad": vad},
+    )
+    if not resp.ok:
+        return resp
+    session_url = f"{API_URL}/upload/sessions/{resp.json()['upload_id']}"
+
+    progress_bar = st.progress(0.0, text="📤 Uploading audio...")
+    offset, retries = 0, 0
+    while offset < uploaded.size:
+        uploaded.seek(offset)
+        chunk = uploaded.read(UPLOAD_CHUNK_BYTES)
+        try:
+            r = requests.put(session_url, params={"offset": offset}, data=chunk)
+            r.raise_for_status()
+            offset = r.json()["received_bytes"]
+        except requests.RequestException:
+            retries += 1
+            if retries > UPLOAD_RETRIES:
+                progress_bar.empty()
+                raise
+            # Ask the server how much it actually has and resume from there
+            offset = requests.get(session_url).json()["received_bytes"]
+        progress_bar.progress(offset / uploaded.size, text="📤 Uploading audio...")
+
+    progress_bar.empty()
+    return requests.post(f"{session_url}/complete")
+
+def stream_transcript(upload):
+    """
+    Renders the transcript live while the backend transcribes it, then returns the finished job.
+    """
+    progress_bar = st.progress(0.0, text="🔄 Transcribing audio...")
+    live_text = st.empty()
+    lines = []
+    error = None
+
+    with requests.get(f"{API_URL}/upload/{upload['file_id']}/stream", stream=True) as r:
+        if r.status_code != 200:
+            progress_bar.empty()
+            return {"status": "failed", "error": r.text}
+        for raw in r.iter_lines():
+            if not raw:
+                continue
+            event = json.loads(raw)
+            if event["type"] == "segment":
+                lines.append(event["line"])
+                live_text.text_area("Live transcript", value="\n".join(lines), height=300)
+            elif event["type"] == "error":
+                error = event.get("error")
+            progress = 1.0 if event["type"] == "done" else event.get("progress", 0.0)
+            progress_bar.progress(min(progress, 1.0), text="🔄 Transcribing audio...")
+
+    progress_bar.empty()
+    live_text.empty()
+    if error:
+        return {"status": "failed", "error": error}
+    return requests.get(f"{API_URL}/jobs/{upload['job_id']}").json()
+
+def render_results(result):
+    """Renders every analysis section; sections not generated yet show as empty."""
+    # Short Summary
+    st.markdown('<div class="section-header">📋 Short Summary</div>', unsafe_allow_html=True)
+    render_summary(result.get("summary_short", []))
+
+    # Detailed Summary
+    st.markdown('<div class="section-header">📄 Detailed Summary</div>', unsafe_allow_html=True)
+    st.markdown(result.get("summary_detailed", ""))
+
+    # Discussion Flow
+    st.markdown('<div class="section-header">💬 Discussion Flow</div>', unsafe_allow_html=True)
+    discussion_flow = result.get("discussion_flow", [])
+    if discussion_flow:
+        for i, point in enumerate(discussion_flow, 1):
+            st.markdown(f"**{i}.** {point}")
+    else:
+        st.info("No discussion flow available.")
+
+    # Timeline - always show (will display "No timeline items" if empty)
+    st.markdown('<div class="section-header">⏱️ Timeline</div>', unsafe_allow_html=True)
+    render_timeline(result.get("timeline", []))
+
+    # Action Items
+    st.markdown('<div class="section-header">✅ Action Items</div>', unsafe_allow_html=True)
+    render_action_items(result.get("action_items", []))
+
+    # Speaker Sentiment - always show (will handle empty dict)
+    sentiment_data = result.get("speaker_sentiment", {})
+    if sentiment_data:
+        st.markdown('<div class="section-header">😊 Speaker Sentiment</div>', unsafe_allow_html=True)
+        render_sentiment(sentiment_data)
+    else:
+        st.markdown('<div class="section-header">😊 Speaker Sentiment</div>', unsafe_allow_html=True)
+        st.info("No sentiment analysis available.")
+
+def stream_analysis(payload):
+    """
+    Renders the analysis section by section while the backend streams it, then
+    returns the final result, or None after showing the error.
+    """
+    live = st.empty()
+    partial = {}
+    result = None
+    error = None
+
+    with st.spinner("🤖 AI is analyzing your transcript..."):
+        with requests.post(f"{API_URL}/process/stream", json=payload, stream=True) as r:
+            if r.status_code != 200:
+                st.error(f"❌ Processing failed: {r.text}")
+                return None
+            for raw in r.iter_lines(decode_unicode=True):
+                if not raw or not raw.startswith("data: "):
+                    continue
+                event = json.loads(raw[len("data: "):])
+                if event["type"] == "item":
+                    items = partial.setdefault(event["field"], [])
+                    if event["index"] == len(items):
+                        items.append(event["value"])
+                elif event["type"] == "field":
+                    partial[event["field"]] = event["value"]
+                elif event["type"] == "result":
+                    result = event["result"]
+                    continue
+                elif event["type"] == "error":
+                    error = event.get("error")
+                    continue
+                with live.container():
+                    render_results(partial)
+
+    live.empty()
+    if result is None:
+        st.error(f"❌ Processing failed: {error or 'no result received'}")
+    return result
+
 def home_page():
     st.markdown("""
         <div class="main-header">
@@ -274,6 +416,16 @@ def upload_page():
             value=datetime.today(),
             help="This date will be used as the reference for calculating deadlines (YYYY-MM-DD)"
         )
+        transcription_profile = st.selectbox(
+            "Transcription speed",
+            ["accurate", "balanced", "fast"],
+            help="Faster profiles use a smaller beam search and trade some accuracy for throughput"
+        )
+        skip_silence = st.checkbox(
+            "Skip silence",
+            True,
+            help="Cut long silent stretches before transcribing; timestamps still match the recording"
+        )
     
     with col2:
         include_speakers = st.checkbox("Preserve speaker labels", True, help="Keep speaker names/identifiers in the analysis", disabled=True)
@@ -289,11 +441,11 @@ def upload_page():
         "meeting_date": meeting_date.isoformat() if meeting_date else None,
     }
     
-    # Clear results if options changed
+    # Options only filter the stored full analysis, so re-fetch instead of clearing results
+    refresh_result = False
     if "last_options" in st.session_state:
         if st.session_state.last_options != current_options:
-            st.session_state.processing_result = None
-            # Remove: st.session_state.result_options = None  
+            refresh_result = st.session_state.processing_result is not None
     st.session_state.last_options = current_options
 
     upload_clicked = False
@@ -307,15 +459,26 @@ def upload_page():
     
     # Handle file upload only when button is clicked
     if uploaded and upload_clicked:
-        with st.spinner("🔄 Uploading and extracting text..."):
-            files = {"file": (uploaded.name, uploaded.getvalue())}
-            resp = requests.post(f"{API_URL}/upload", files=files)
-            if resp.status_code != 200:
-                st.error(f"❌ Upload failed: {resp.text}")
+        try:
+            resp = upload_in_chunks(uploaded, profile=transcription_profile, vad=skip_silence)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            detail = e.response.text if e.response is not None else e
+            st.error(f"❌ Upload failed: {detail}")
+            st.session_state.upload_response = None
+        else:
+            upload = resp.json()
+            # Cache hits come back already transcribed
+            job = upload if upload["status"] == "done" else stream_transcript(upload)
+            if job.get("status") != "done":
+                st.error(f"❌ Transcription failed: {job.get('error') or 'unknown error'}")
                 st.session_state.upload_response = None
             else:
-                st.session_state.upload_response = resp.json()
-                st.success("✅ File uploaded and text extracted successfully!")
+                st.session_state.upload_response = job
+                cached_note = " (served from cache)" if upload.get("cache_hit") else ""
+                st.success(f"✅ File uploaded and text extracted successfully!{cached_note}")
+                if job.get("skipped_seconds"):
+                    st.info(f"🔇 Skipped {job['skipped_seconds']:.0f}s of silence")
     
     # Display transcript if available
     transcript = ""
@@ -336,7 +499,7 @@ def upload_page():
                 type="primary"
             )
         
-        if process_btn:
+        if process_btn or refresh_result:
             payload = {
                 "transcript": transcript,
                 "meeting_title": meeting_title,
@@ -345,13 +508,10 @@ def upload_page():
                 "include_sentiment": include_sentiment,
                 "include_timeline": include_timeline,
                 "language": "english",
+                "full_analysis": True,
             }
-            with st.spinner("🤖 AI is analyzing your transcript... This may take a moment."):
-                r = requests.post(f"{API_URL}/process", json=payload)
-            if r.status_code != 200:
-                st.error(f"❌ Processing failed: {r.text}")
-            else:
-                result = r.json()
+            result = stream_analysis(payload)
+            if result is not None:
                 result["meeting_title"] = meeting_title
                 result["meeting_date"] = meeting_date.isoformat() if meeting_date else None
                 st.session_state.processing_result = result
@@ -365,40 +525,10 @@ def upload_page():
         
         st.markdown("---")
         st.markdown("## 📊 Analysis Results")
+        for section, error in (result.get("errors") or {}).items():
+            st.warning(f"⚠️ The {section.replace('_', ' ')} section could not be generated: {error}")
         
-        # Short Summary
-        st.markdown('<div class="section-header">📋 Short Summary</div>', unsafe_allow_html=True)
-        render_summary(result.get("summary_short", []))
-        
-        # Detailed Summary
-        st.markdown('<div class="section-header">📄 Detailed Summary</div>', unsafe_allow_html=True)
-        st.markdown(result.get("summary_detailed", ""))
-        
-        # Discussion Flow
-        st.markdown('<div class="section-header">💬 Discussion Flow</div>', unsafe_allow_html=True)
-        discussion_flow = result.get("discussion_flow", [])
-        if discussion_flow:
-            for i, point in enumerate(discussion_flow, 1):
-                st.markdown(f"**{i}.** {point}")
-        else:
-            st.info("No discussion flow available.")
-        
-        # Timeline - always show (will display "No timeline items" if empty)
-        st.markdown('<div class="section-header">⏱️ Timeline</div>', unsafe_allow_html=True)
-        render_timeline(result.get("timeline", []))
-        
-        # Action Items
-        st.markdown('<div class="section-header">✅ Action Items</div>', unsafe_allow_html=True)
-        render_action_items(result.get("action_items", []))
-        
-        # Speaker Sentiment - always show (will handle empty dict)
-        sentiment_data = result.get("speaker_sentiment", {})
-        if sentiment_data:
-            st.markdown('<div class="section-header">😊 Speaker Sentiment</div>', unsafe_allow_html=True)
-            render_sentiment(sentiment_data)
-        else:
-            st.markdown('<div class="section-header">😊 Speaker Sentiment</div>', unsafe_allow_html=True)
-            st.info("No sentiment analysis available.")
+        render_results(result)
         
         # Download button
         st.markdown("---")
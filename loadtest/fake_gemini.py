@@ -0,0 +1,315 @@
+"""
+Local stand-in for the Gemini REST API, for load-testing /process without
+spending quota. It answers the two endpoints the google-genai SDK calls:
+
+    POST /v1beta/models/{model}:generateContent
+    POST /v1beta/models/{model}:streamGenerateContent?alt=sse
+
+with a meeting-minutes JSON answer after a sampled delay, and can inject errors,
+hung requests and malformed JSON. Point the backend at it with
+
+    LLM_BASE_URL=http://localhost:8089 GOOGLE_API_KEY=fake uvicorn backend.main:app
+
+and start it with e.g.
+
+    python -m loadtest.fake_gemini --latency lognormal:1.5,0.4 --tokens-per-second 150 \\
+        --error-rate 0.02 --timeout-rate 0.01 --malformed-rate 0.05
+
+GET /stats returns counters of what was served and injected.
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+logger = logging.getLogger("fake_gemini")
+
+PATH_RE = re.compile(r"^/v1(?:beta|alpha)?/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)$")
+# Same rough estimate as prompt_builder.estimate_tokens
+CHARS_PER_TOKEN = 4
+INJECTED_ERRORS = [
+    (429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    (500, "INTERNAL", "An internal error has occurred."),
+    (503, "UNAVAILABLE", "The model is overloaded. Please try again later."),
+]
+
+
+# ---------------- Latency ----------------
+
+class Latency:
+    """
+    Samples delays in seconds from a distribution given as "name:params":
+    fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA or exponential:MEAN.
+    """
+
+    def __init__(self, spec: str, rng: random.Random):
+        name, _, params = spec.partition(":")
+        try:
+            self.params = [float(p) for p in params.split(",")] if params else []
+        except ValueError:
+            raise ValueError(f"Bad latency parameters: {spec!r}")
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+        if expected.get(name) != len(self.params):
+            raise ValueError(f"Bad latency spec {spec!r}; see --help for the supported forms")
+        self.name = name
+        self.rng = rng
+
+    def sample(self) -> float:
+        p = self.params
+        if self.name == "fixed":
+            value = p[0]
+        elif self.name == "uniform":
+            value = self.rng.uniform(p[0], p[1])
+        elif self.name == "normal":
+            value = self.rng.gauss(p[0], p[1])
+        elif self.name == "lognormal":
+            value = self.rng.lognormvariate(math.log(p[0]), p[1])
+        else:
+            value = self.rng.expovariate(1 / p[0])
+        return max(0.0, value)
+
+
+# ---------------- Answers ----------------
+
+def prompt_text(body: dict) -> str:
+    return "".join(
+        part.get("text", "")
+        for content in body.get("contents") or []
+        for part in content.get("parts") or []
+    )
+
+
+def analysis_json(prompt: str, rng: random.Random) -> str:
+    """A plausible analysis that varies with the prompt, so responses are not all identical."""
+    speakers = sorted(set(re.findall(r"^(?:\[[^\]]*\]\s*)?([A-Z][a-z]+):", prompt, re.MULTILINE)))[:6]
+    speakers = speakers or ["Alice", "Bob"]
+    answer = {
+        "summary_short": [f"Point {i + 1} from the discussion" for i in range(5)],
+        "summary_detailed": " ".join(
+            f"{rng.choice(speakers)} raised item {i + 1} and the group agreed on next steps." for i in range(8)
+        ),
+        "discussion_flow": ["Introductions", "Status updates", "Open issues", "Wrap-up"],
+        "timeline": [
+            {"timestamp": f"00:{i * 5:02d}", "topic": topic}
+            for i, topic in enumerate(["Introductions", "Status updates", "Open issues"])
+        ],
+        "action_items": [
+            {"task": f"Follow up on item {i + 1}", "assigned_to": rng.choice(speakers), "deadline": None}
+            for i in range(rng.randint(1, 4))
+        ],
+        "speaker_sentiment": {s: rng.choice(["positive", "neutral", "negative"]) for s in speakers},
+    }
+    return json.dumps(answer, indent=2)
+
+
+def malformed(text: str, rng: random.Random) -> str:
+    """Breaks the answer the ways real models do: prose around it, a fence, or truncation."""
+    kind = rng.choice(["prose", "fence", "truncated", "trailing_comma"])
+    if kind == "prose":
+        return f"Here are the meeting minutes you asked for:\n{text}\nLet me know if you need changes."
+    if kind == "fence":
+        return f"```json\n{text}\n```"
+    if kind == "trailing_comma":
+        return text[:-2] + ",\n}"
+    return text[: rng.randint(len(text) // 3, len(text) - 2)]
+
+
+def usage(prompt: str, text: str) -> dict:
+    prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+    output_tokens = len(text) // CHARS_PER_TOKEN
+    return {
+        "promptTokenCount": prompt_tokens,
+        "candidatesTokenCount": output_tokens,
+        "totalTokenCount": prompt_tokens + output_tokens,
+    }
+
+
+def candidate(text: str, finished: bool) -> dict:
+    result = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+    if finished:
+        result["finishReason"] = "STOP"
+    return result
+
+
+# ---------------- Server ----------------
+
+class FakeGemini:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.latency = Latency(args.latency, self.rng)
+        self.stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "ok": 0, "errors": 0, "timeouts": 0, "malformed": 0}
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def plan(self, prompt: str) -> dict:
+        """Decides everything random about one request up front, under the lock."""
+        with self.rng_lock:
+            outcome = self.rng.random()
+            first_token = self.latency.sample()
+            text = analysis_json(prompt, self.rng)
+            if self.rng.random() < self.args.malformed_rate:
+                text = malformed(text, self.rng)
+                broken = True
+            else:
+                broken = False
+            error = self.rng.choice(INJECTED_ERRORS)
+
+        if outcome < self.args.error_rate:
+            return {"kind": "error", "delay": first_token, "error": error}
+        if outcome < self.args.error_rate + self.args.timeout_rate:
+            return {"kind": "timeout"}
+        return {"kind": "ok", "delay": first_token, "text": text, "malformed": broken}
+
+    def seconds_for(self, text: str) -> float:
+        if self.args.tokens_per_second <= 0:
+            return 0.0
+        return len(text) / CHARS_PER_TOKEN / self.args.tokens_per_second
+
+
+def make_handler(fake: FakeGemini):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+        def send_json(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/stats":
+                with fake.stats_lock:
+                    self.send_json(200, dict(fake.stats))
+                return
+            self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            match = PATH_RE.match(urlparse(self.path).path)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            if match is None:
+                self.send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                return
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                self.send_json(400, {"error": {"code": 400, "message": "Invalid JSON", "status": "INVALID_ARGUMENT"}})
+                return
+
+            fake.count("requests")
+            prompt = prompt_text(body)
+            plan = fake.plan(prompt)
+
+            if plan["kind"] == "timeout":
+                fake.count("timeouts")
+                # Hold the connection without answering, like a stuck upstream
+                time.sleep(fake.args.hang_seconds)
+                self.close_connection = True
+                return
+
+            time.sleep(plan["delay"])
+            if plan["kind"] == "error":
+                fake.count("errors")
+                code, status, message = plan["error"]
+                self.send_json(code, {"error": {"code": code, "message": message, "status": status}})
+                return
+
+            if plan["malformed"]:
+                fake.count("malformed")
+            model = match.group("model")
+            if match.group("method") == "streamGenerateContent":
+                fake.count("streamed")
+                self.stream(prompt, plan["text"], model)
+            else:
+                time.sleep(fake.seconds_for(plan["text"]))
+                self.send_json(200, {
+                    "candidates": [candidate(plan["text"], finished=True)],
+                    "usageMetadata": usage(prompt, plan["text"]),
+                    "modelVersion": model,
+                })
+            fake.count("ok")
+
+        def stream(self, prompt: str, text: str, model: str):
+            """Sends the answer as SSE events of --chunk-tokens tokens at --tokens-per-second."""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            step = max(1, fake.args.chunk_tokens * CHARS_PER_TOKEN)
+            pieces = [text[i:i + step] for i in range(0, len(text), step)] or [""]
+            for i, piece in enumerate(pieces):
+                finished = i == len(pieces) - 1
+                event = {"candidates": [candidate(piece, finished)], "modelVersion": model}
+                if finished:
+                    event["usageMetadata"] = usage(prompt, text)
+                try:
+                    self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                if not finished:
+                    time.sleep(fake.seconds_for(piece))
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini API for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument(
+        "--latency", default="lognormal:1.0,0.5",
+        help="time to first token: fixed:S, uniform:LO,HI, normal:MEAN,SD, "
+             "lognormal:MEDIAN,SIGMA or exponential:MEAN (seconds; default lognormal:1.0,0.5)",
+    )
+    parser.add_argument("--tokens-per-second", type=float, default=200.0,
+                        help="output speed after the first token; 0 sends everything at once (default 200)")
+    parser.add_argument("--chunk-tokens", type=int, default=16, help="tokens per streamed event (default 16)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 429/500/503")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that never answer")
+    parser.add_argument("--hang-seconds", type=float, default=600.0,
+                        help="how long a never-answering request holds its connection (default 600)")
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="share of answers with prose, fences, truncation or trailing commas")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.error_rate + args.timeout_rate > 1:
+        parser.error("--error-rate and --timeout-rate add up to more than 1")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        fake = FakeGemini(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    server.daemon_threads = True
+    logger.info(f"Fake Gemini listening on http://{args.host}:{args.port} (latency {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
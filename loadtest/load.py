@@ -0,0 +1,265 @@
+"""
+Open-loop load generator for the backend.
+
+    python -m loadtest.load --scenario process --rps 5 --duration 60
+    python -m loadtest.load --scenario upload --rps 1 --duration 120 --wait-jobs
+    python -m loadtest.load --scenario mixed --upload-share 0.2 --rps 4 --json results.json
+
+Requests are started on a fixed schedule of --rps whether or not earlier ones
+have finished, and latency is measured from the scheduled start, so a backend
+that falls behind shows up as growing latency rather than as a lower send rate.
+Transcripts and audio are unique per request so the LLM, analysis and transcript
+caches do not answer them; pass --repeat to measure the cached path instead.
+For realistic /process numbers, run the backend against loadtest/fake_gemini.py.
+"""
+import argparse
+import array
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+SAMPLE_RATE = 16000
+SPEAKERS = ["Alice", "Bob", "Carol", "Dave"]
+SENTENCES = [
+    "um, so I think we should, uh, move the release to next Friday.",
+    "The migration freeze starts tomorrow and lasts until the end of the month.",
+    "Can you update the dashboard and deploy it by Wednesday?",
+    "I'm not sure the load tests cover the new batch endpoint yet.",
+    "Let's add monitoring for the queue depth before we scale out.",
+]
+
+_local = threading.local()
+
+
+def session() -> requests.Session:
+    """One keep-alive session per worker thread."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+# ---------------- Payloads ----------------
+
+def synthetic_transcript(lines: int, nonce: str) -> str:
+    rows, t = [f"[0.00s - 1.00s] Alice: Meeting reference {nonce}."], 1.0
+    for i in range(lines):
+        rows.append(f"[{t:.2f}s - {t + 4.2:.2f}s] {SPEAKERS[i % 4]}: {SENTENCES[i % 5]}")
+        t += 4.5
+    return "\n".join(rows)
+
+
+def synthetic_audio(seconds: float) -> bytes:
+    """
+    16 kHz mono WAV alternating voiced-like bursts with silences, so the silence
+    skipping in the transcription pipeline has something to cut.
+    """
+    samples = array.array("h")
+    t = 0
+    total = int(seconds * SAMPLE_RATE)
+    while t < total:
+        burst = min(total - t, int(SAMPLE_RATE * 2.5))
+        freq = 140 + 60 * ((t // SAMPLE_RATE) % 3)
+        for i in range(burst):
+            envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * i / SAMPLE_RATE)
+            samples.append(int(8000 * envelope * math.sin(2 * math.pi * freq * i / SAMPLE_RATE)))
+        t += burst
+        gap = min(total - t, SAMPLE_RATE * 2)
+        samples.extend([0] * gap)
+        t += gap
+    return samples.tobytes()
+
+
+def unique_wav(pcm: bytes, rng: random.Random) -> bytes:
+    """Appends a short burst of faint noise so every upload hashes differently."""
+    tail = array.array("h", (rng.randint(-20, 20) for _ in range(SAMPLE_RATE // 10)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm + tail.tobytes())
+    return buffer.getvalue()
+
+
+# ---------------- Requests ----------------
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples: dict[str, list[tuple[bool, str, float]]] = {}
+        # Requests a worker picked up more than a second after their scheduled start
+        self.lagged = 0
+
+    def record(self, name: str, ok: bool, outcome: str, seconds: float):
+        with self.lock:
+            self.samples.setdefault(name, []).append((ok, outcome, seconds))
+
+
+def timed(results: Results, name: str, scheduled: float, call):
+    """Runs one request and records its latency from the scheduled start."""
+    if time.perf_counter() - scheduled > 1:
+        with results.lock:
+            results.lagged += 1
+    try:
+        response = call()
+        ok = response.status_code < 400
+        outcome = str(response.status_code)
+    except requests.RequestException as e:
+        response, ok, outcome = None, False, type(e).__name__
+    results.record(name, ok, outcome, time.perf_counter() - scheduled)
+    return response if ok else None
+
+
+def do_process(args, results: Results, scheduled: float, rng: random.Random):
+    nonce = "fixed" if args.repeat else uuid.uuid4().hex
+    payload = {
+        "transcript": synthetic_transcript(args.transcript_lines, nonce),
+        "meeting_title": "Load test",
+        "mode": args.mode,
+    }
+    timed(results, "process", scheduled, lambda: session().post(
+        f"{args.base_url}/process", json=payload, timeout=args.timeout
+    ))
+
+
+def do_upload(args, results: Results, scheduled: float, rng: random.Random):
+    body = unique_wav(args.pcm, random.Random(0) if args.repeat else rng)
+    data = {"profile": args.profile} if args.profile else {}
+    response = timed(results, "upload", scheduled, lambda: session().post(
+        f"{args.base_url}/upload", files={"file": ("loadtest.wav", body, "audio/wav")},
+        data=data, timeout=args.timeout,
+    ))
+    if response is None or not args.wait_jobs:
+        return
+
+    job = response.json()
+    deadline = scheduled + args.timeout
+    while job.get("status") not in ("done", "failed"):
+        if time.perf_counter() > deadline:
+            results.record("transcription", False, "timeout", time.perf_counter() - scheduled)
+            return
+        time.sleep(args.poll_interval)
+        try:
+            job = session().get(f"{args.base_url}/jobs/{job['job_id']}", timeout=args.timeout).json()
+        except (requests.RequestException, ValueError) as e:
+            results.record("transcription", False, type(e).__name__, time.perf_counter() - scheduled)
+            return
+    results.record("transcription", job["status"] == "done", job["status"], time.perf_counter() - scheduled)
+
+
+# ---------------- Report ----------------
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(results: Results, elapsed: float) -> dict:
+    summary = {}
+    for name, samples in sorted(results.samples.items()):
+        ok_latencies = sorted(seconds for ok, _, seconds in samples if ok)
+        outcomes: dict[str, int] = {}
+        for _, outcome, _ in samples:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        errors = len(samples) - len(ok_latencies)
+        summary[name] = {
+            "requests": len(samples),
+            "ok": len(ok_latencies),
+            "error_rate": errors / len(samples),
+            "throughput_rps": len(ok_latencies) / elapsed,
+            "p50_s": percentile(ok_latencies, 50),
+            "p95_s": percentile(ok_latencies, 95),
+            "p99_s": percentile(ok_latencies, 99),
+            "max_s": ok_latencies[-1] if ok_latencies else float("nan"),
+            "outcomes": outcomes,
+        }
+    return summary
+
+
+def print_report(summary: dict, elapsed: float, lagged: int):
+    print(f"\nElapsed {elapsed:.1f}s")
+    print(f"{'name':<15}{'reqs':>7}{'ok':>7}{'err%':>8}{'ok/s':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, s in summary.items():
+        print(
+            f"{name:<15}{s['requests']:>7}{s['ok']:>7}{s['error_rate'] * 100:>7.1f}%{s['throughput_rps']:>8.2f}"
+            f"{s['p50_s']:>8.2f}s{s['p95_s']:>8.2f}s{s['p99_s']:>8.2f}s{s['max_s']:>8.2f}s"
+        )
+        failures = {k: v for k, v in s["outcomes"].items() if not k.startswith(("1", "2", "3")) and k != "done"}
+        if failures:
+            print(f"{'':<15}failures: {', '.join(f'{k}={v}' for k, v in sorted(failures.items()))}")
+    if lagged:
+        print(f"\nWarning: {lagged} requests started more than 1s late; raise --workers or lower --rps.")
+
+
+# ---------------- Main ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive /upload and /process at a target request rate")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=["process", "upload", "mixed"], default="process")
+    parser.add_argument("--upload-share", type=float, default=0.2, help="share of uploads in the mixed scenario")
+    parser.add_argument("--rps", type=float, default=2.0, help="target requests per second (default 2)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to send for (default 30)")
+    parser.add_argument("--workers", type=int, default=64, help="most requests in flight at once (default 64)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--transcript-lines", type=int, default=200, help="lines per /process transcript")
+    parser.add_argument("--mode", default="auto", help="/process mode (default auto)")
+    parser.add_argument("--audio-seconds", type=float, default=20.0, help="length of the synthetic audio")
+    parser.add_argument("--profile", default=None, help="transcription profile sent with uploads")
+    parser.add_argument("--wait-jobs", action="store_true", help="poll each upload's job and time the transcription")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--repeat", action="store_true", help="send identical payloads, exercising the caches")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    args = parser.parse_args()
+    args.base_url = args.base_url.rstrip("/")
+    if args.rps <= 0:
+        parser.error("--rps must be positive")
+
+    rng = random.Random(args.seed)
+    if args.scenario != "process":
+        args.pcm = synthetic_audio(args.audio_seconds)
+
+    results = Results()
+    total = int(args.rps * args.duration)
+    print(f"Sending {total} requests ({args.scenario}) at {args.rps} rps to {args.base_url}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for i in range(total):
+            scheduled = start + i / args.rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if args.scenario == "upload" or (args.scenario == "mixed" and rng.random() < args.upload_share):
+                task = do_upload
+            else:
+                task = do_process
+            pool.submit(task, args, results, scheduled, random.Random(rng.random()))
+        print(f"All requests sent after {time.perf_counter() - start:.1f}s, waiting for responses...")
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(results, elapsed)
+    print_report(summary, elapsed, results.lagged)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items() if k != "pcm"}, "results": summary}, f, indent=2)
+        print(f"Saved summary to {args.json}")
+
+    return 0 if all(s["ok"] for s in summary.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from backend.utils.json_stream import IncrementalJSONParser
+
+DOC = {
+    "summary_short": ["one", "two \"quoted\" {not a brace}", "three\\n"],
+    "summary_detailed": "Line one.\nLine é two, with a comma: and a colon.",
+    "action_items": [
+        {"task": "Ship it", "assigned_to": "Ann", "deadline": None},
+        {"task": "Write [docs]", "assigned_to": None, "deadline": "2026-01-01"},
+    ],
+    "speaker_sentiment": {"Ann": "positive", "Bob": "neutral"},
+    "timeline": [],
+}
+
+
+def feed_all(pieces) -> list[tuple]:
+    parser = IncrementalJSONParser()
+    events = []
+    for piece in pieces:
+        events.extend(parser.feed(piece))
+    return events
+
+
+def expected_events(doc: dict) -> list[tuple]:
+    events = []
+    for field, value in doc.items():
+        if isinstance(value, list):
+            events.extend(("item", field, i, item) for i, item in enumerate(value))
+        events.append(("field", field, value))
+    return events
+
+
+def test_whole_document():
+    assert feed_all([json.dumps(DOC)]) == expected_events(DOC)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_split_feeds(size):
+    text = json.dumps(DOC, indent=2)
+    assert feed_all(text[i:i + size] for i in range(0, len(text), size)) == expected_events(DOC)
+
+
+def test_escape_split_across_feeds():
+    text = json.dumps({"a": 'say \\"hi\\" }', "b": ["x\\", "y"]})
+    split = text.index("\\") + 1
+    assert feed_all([text[:split], text[split:]]) == [
+        ("field", "a", 'say \\"hi\\" }'),
+        ("item", "b", 0, "x\\"),
+        ("item", "b", 1, "y"),
+        ("field", "b", ["x\\", "y"]),
+    ]
+
+
+def test_nested_objects_are_reported_whole():
+    doc = {"outer": {"inner": {"list": [1, {"deep": [2, 3]}]}, "n": 1}, "items": [{"a": {"b": [1, 2]}}]}
+    assert feed_all(json.dumps(doc)[i:i + 5] for i in range(0, len(json.dumps(doc)), 5)) == [
+        ("field", "outer", doc["outer"]),
+        ("item", "items", 0, {"a": {"b": [1, 2]}}),
+        ("field", "items", doc["items"]),
+    ]
+
+
+def test_items_are_reported_before_the_array_ends():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"summary_short": ["a", "b"') == [("item", "summary_short", 0, "a")]
+    assert parser.feed(', "c"]') == [("item", "summary_short", 1, "b"), ("item", "summary_short", 2, "c")]
+    assert parser.feed("}") == [("field", "summary_short", ["a", "b", "c"])]
+
+
+def test_code_fence_and_trailing_text_are_ignored():
+    assert feed_all(["```json\n", '{"a": 1}', "\n```\nMore text {\"b\": 2}"]) == [("field", "a", 1)]
+
+
+def test_unparsable_values_are_skipped():
+    assert feed_all(['{"a": [1, oops, 2], "b": tru, "c": 3}']) == [
+        ("item", "a", 0, 1),
+        ("item", "a", 1, 2),
+        ("field", "c", 3),
+    ]
@@ -0,0 +1,43 @@
+import pytest
+
+from backend.services.audio_preprocess import SAMPLE_RATE, TimestampMap
+
+
+def regions(*seconds):
+    return [(int(start * SAMPLE_RATE), int(end * SAMPLE_RATE)) for start, end in seconds]
+
+
+# Speech at 2-5s and 10-12s of the original; 0-3s and 3-5s of the stripped audio
+MAP = TimestampMap(regions((2, 5), (10, 12)))
+
+
+@pytest.mark.parametrize("stripped, original", [
+    (0.0, 2.0),
+    (1.5, 3.5),
+    (3.5, 10.5),
+    (5.0, 12.0),
+])
+def test_to_original(stripped, original):
+    assert MAP.to_original(stripped) == pytest.approx(original)
+
+
+def test_seam_maps_to_next_region_for_starts():
+    assert MAP.to_original(3.0) == pytest.approx(10.0)
+
+
+def test_seam_maps_to_previous_region_for_ends():
+    assert MAP.to_original(3.0, is_end=True) == pytest.approx(5.0)
+
+
+def test_times_past_the_last_region_are_clamped():
+    assert MAP.to_original(9.0) == pytest.approx(12.0)
+
+
+def test_region_at_the_start_of_the_recording():
+    timestamp_map = TimestampMap(regions((0, 1), (4, 6)))
+    assert timestamp_map.to_original(0.5) == pytest.approx(0.5)
+    assert timestamp_map.to_original(1.5) == pytest.approx(4.5)
+
+
+def test_no_regions_is_the_identity():
+    assert TimestampMap([]).to_original(7.25) == 7.25
@@ -0,0 +1,57 @@
+import pytest
+
+from backend.utils.validators import extract_json_object, parse_llm_json
+
+
+def test_bare_json():
+    assert parse_llm_json('{"a": 1}') == {"a": 1}
+
+
+@pytest.mark.parametrize("text", [
+    '```json\n{"a": 1, "b": [2]}\n```',
+    'Here is the analysis:\n{"a": 1, "b": [2]}\nLet me know if you need more.',
+])
+def test_wrapped_json(text):
+    assert parse_llm_json(text) == {"a": 1, "b": [2]}
+
+
+def test_braces_inside_strings():
+    assert parse_llm_json('Sure: {"a": "}{", "b": "\\"}"} done') == {"a": "}{", "b": '"}'}
+
+
+def test_trailing_commas():
+    assert parse_llm_json('```json\n{"a": [1, 2,], "b": 3,}\n```') == {"a": [1, 2], "b": 3}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": "x", "b', {"a": "x"}),
+    ('{"a": "x", "b"', {"a": "x"}),
+    ('{"a": "x", "b": ', {"a": "x"}),
+    ('{"a": "x", "b": "val', {"a": "x", "b": "val"}),
+    ('{"a": tru', {}),
+    ('{"a": 1, "b": nul', {"a": 1}),
+    ('{"a": [true, fa', {"a": [True]}),
+    ('{"a": [1, 2, 3.', {"a": [1, 2]}),
+    ('{"a": ["x", "y', {"a": ["x", "y"]}),
+    ('{"a": {"b": "c", "d"', {"a": {"b": "c"}}),
+    ('{"a": "x\\', {"a": "x"}),
+    ('```json\n{"a": [{"task": "t", "assigned_to": nu', {"a": [{"task": "t"}]}),
+])
+def test_truncated_output(text, expected):
+    assert parse_llm_json(text) == expected
+
+
+def test_complete_literals_are_kept():
+    assert parse_llm_json('{"a": true, "b": false, "c": null, "d": 1e5, "e": [1') == {
+        "a": True, "b": False, "c": None, "d": 1e5, "e": [1],
+    }
+
+
+def test_extract_returns_first_object():
+    assert extract_json_object('x {"a": {"b": 1}} {"c": 2}') == '{"a": {"b": 1}}'
+
+
+@pytest.mark.parametrize("text", ["no json here", "[1, 2]"])
+def test_not_an_object(text):
+    with pytest.raises(ValueError):
+        parse_llm_json(text)